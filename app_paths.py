@@ -0,0 +1,19 @@
+import os
+
+
+def get_app_dir() -> str:
+    """Per-user data folder of OCR Agent (created on first use)"""
+    base = os.environ.get('LOCALAPPDATA')
+    if base:
+        path = os.path.join(base, 'OCR_Agent')
+    else:
+        path = os.path.join(os.path.expanduser('~'), '.ocr_agent')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def get_diagnostics_dir() -> str:
+    """Folder for profiling reports and other diagnostics"""
+    path = os.path.join(get_app_dir(), 'diagnostics')
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,80 @@
+import asyncio
+import concurrent.futures
+import threading
+from typing import Awaitable, Optional
+
+
+class AsyncCore:
+    """asyncio event loop running on a dedicated thread
+
+    All network I/O for OCR runs here. CPU-bound work (image encoding) goes
+    to a small bounded executor, so the number of threads does not grow with
+    the number of queued jobs.
+    """
+
+    def __init__(self, name: str = "OCRAsyncLoop", executor_workers: int = 2):
+        self.name = name
+        self.executor_workers = executor_workers
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._started = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the loop thread if it is not running yet"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._started.clear()
+            self._thread = threading.Thread(target=self._run_loop, name=self.name, daemon=True)
+            self._thread.start()
+        self._started.wait()
+
+    def _run_loop(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.executor_workers,
+            thread_name_prefix=f"{self.name}-worker"
+        )
+        self.loop.set_default_executor(self._executor)
+        print(f"[Async] Event loop started on thread {self.name}")
+        self.loop.call_soon(self._started.set)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self._executor.shutdown(wait=False)
+            self.loop.close()
+            print("[Async] Event loop stopped")
+
+    def submit(self, coro: Awaitable) -> concurrent.futures.Future:
+        """Schedule a coroutine from any thread; returns a thread-safe future"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None):
+        """Run a coroutine and block the calling thread until it finishes"""
+        if self.in_loop_thread():
+            raise RuntimeError("AsyncCore.run() cannot be called from the event loop thread")
+        return self.submit(coro).result(timeout)
+
+    def call_soon(self, func, *args):
+        """Run a plain function on the loop thread"""
+        self.start()
+        self.loop.call_soon_threadsafe(func, *args)
+
+    def in_loop_thread(self) -> bool:
+        """Check whether the caller is running on the loop thread"""
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def stop(self, timeout: float = 2.0):
+        """Stop the loop and wait for the thread to exit"""
+        with self._lock:
+            thread = self._thread
+            if not thread or not thread.is_alive():
+                return
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if not self.in_loop_thread():
+            thread.join(timeout)
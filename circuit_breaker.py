@@ -0,0 +1,109 @@
+import threading
+import time
+from typing import Callable, List
+
+
+class CircuitBreaker:
+    """Fail fast after repeated backend failures, then probe again after a cool-down
+
+    States:
+    - closed: requests flow normally, consecutive failures are counted
+    - open: requests are rejected immediately until the cool-down elapses
+    - half-open: a single probe request is let through; success closes the
+      breaker, failure opens it for another cool-down. A probe that ends
+      with neither must be given back with release_probe()
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self._lock = threading.RLock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._listeners: List[Callable[[str], None]] = []
+
+    @property
+    def state(self) -> str:
+        """Current state, moving open -> half-open once the cool-down is over"""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+            self._set_state(self.HALF_OPEN)
+        return self._state
+
+    def _set_state(self, state: str):
+        if state == self._state:
+            return
+        self._state = state
+        if state != self.HALF_OPEN:
+            self._probe_in_flight = False
+        print(f"[Breaker] State changed to {state}")
+        for listener in list(self._listeners):
+            try:
+                listener(state)
+            except Exception as e:
+                print(f"[Breaker] Listener error: {e}")
+
+    def add_listener(self, listener: Callable[[str], None]):
+        """Register a function called with the new state on every transition"""
+        self._listeners.append(listener)
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent to the backend now"""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def release_probe(self):
+        """Give back the half-open probe slot of a request that ended without a
+        success or failure (client error, cancellation, deadline)"""
+        with self._lock:
+            if self._current_state() == self.HALF_OPEN:
+                self._probe_in_flight = False
+
+    def record_success(self):
+        """Report a successful backend call"""
+        with self._lock:
+            self._failures = 0
+            self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        """Report a connection error or timeout"""
+        with self._lock:
+            self._failures += 1
+            state = self._current_state()
+            if state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state(self.OPEN)
+                # Re-arm the probe even if the state did not change
+                self._probe_in_flight = False
+
+    def remaining_cooldown(self) -> float:
+        """Seconds until the next probe is allowed (0 when not open)"""
+        with self._lock:
+            if self._current_state() != self.OPEN:
+                return 0.0
+            return max(0.0, self.cooldown - (time.monotonic() - self._opened_at))
+
+    def describe(self) -> str:
+        """Human readable state for status displays"""
+        state = self.state
+        if state == self.OPEN:
+            return f"unavailable (retry in {self.remaining_cooldown():.0f}s)"
+        if state == self.HALF_OPEN:
+            return "recovering"
+        return "ok"
@@ -0,0 +1,33 @@
+import time
+from typing import Optional
+
+
+class Deadline:
+    """Absolute time budget for a single OCR job
+
+    interactive marks jobs someone is waiting for; background jobs (watch
+    mode) only get request slots no interactive job is waiting for.
+    """
+
+    def __init__(self, budget: float, interactive: bool = True):
+        self.budget = budget
+        self.interactive = interactive
+        self.expires_at = time.monotonic() + budget
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        """Check whether the budget is used up"""
+        return self.remaining() <= 0.0
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """Remaining budget, optionally capped - usable as a socket timeout"""
+        remaining = self.remaining()
+        if cap is not None:
+            return min(cap, remaining)
+        return remaining
+
+    def __repr__(self):
+        return f"Deadline(budget={self.budget:.1f}s, remaining={self.remaining():.2f}s)"
@@ -0,0 +1,147 @@
+import re
+from typing import Optional
+
+# Output real OCR never contains: long runs of one character, chains of empty display math
+DEGENERATE_PATTERNS = [
+    re.compile(r"(.)\1{199,}", re.DOTALL),
+    re.compile(r"(?:\$\$\s*\$\$\s*){3,}"),
+]
+
+
+class GenerationGuard:
+    """Watch streamed model output and detect runaway generation
+
+    Vision models sometimes fall into a loop and repeat a line or a block
+    until the token limit. The guard fires on:
+    - more output than the image can plausibly hold (base_chars plus
+      chars_per_pixel per image pixel; skipped if the size is unknown)
+    - degenerate patterns (DEGENERATE_PATTERNS)
+
+    Repetition alone is not a runaway - table rows and log lines repeat
+    legitimately. It only decides where the output is cut once the length
+    bound is exceeded or the generation ran into the token limit
+    (check_limit): the tail is trimmed to one copy of
+    - the same non-blank line repeated max_line_repeats times in a row
+    - a periodic tail: a chunk of min_period..max_period characters repeated
+      at least min_repeats times and over at least min_span characters
+
+    Checks run every check_every characters, on the tail of the output.
+    """
+
+    def __init__(self, image_pixels: Optional[int] = None, max_line_repeats: int = 12,
+                 min_period: int = 8, max_period: int = 200, min_repeats: int = 6,
+                 min_span: int = 240, base_chars: int = 2000, chars_per_pixel: float = 0.01,
+                 check_every: int = 32):
+        self.max_line_repeats = max_line_repeats
+        self.min_period = min_period
+        self.max_period = max_period
+        self.min_repeats = min_repeats
+        self.min_span = min_span
+        self.max_chars = int(base_chars + image_pixels * chars_per_pixel) if image_pixels else None
+        self.check_every = check_every
+
+        self.text = ""
+        self.tokens = 0
+        self.reason: Optional[str] = None
+        self._keep_chars: Optional[int] = None
+        self._unchecked = 0
+        self._scanned = 0  # patterns are searched in new output only (plus an overlap)
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """Add one streamed chunk; returns the reason once the guard fires"""
+        if self.reason:
+            return self.reason
+        self.text += chunk
+        self.tokens += 1
+        self._unchecked += len(chunk)
+        if self._unchecked >= self.check_every:
+            self._unchecked = 0
+            self.reason = self._check()
+        return self.reason
+
+    def check_limit(self) -> Optional[str]:
+        """The generation ended at the token limit: trim a repeating tail, if there is one"""
+        if not self.reason:
+            self.reason = self._repetition()
+        return self.reason
+
+    def trimmed_text(self) -> str:
+        """Output with the runaway tail removed (the whole output if the guard did not fire)"""
+        if self._keep_chars is None:
+            return self.text
+        return self.text[:self._keep_chars].rstrip()
+
+    def _check(self) -> Optional[str]:
+        text = self.text
+        scan_from = max(0, self._scanned - 400)
+        self._scanned = len(text)
+        for pattern in DEGENERATE_PATTERNS:
+            match = pattern.search(text, scan_from)
+            if match:
+                self._keep_chars = match.start()
+                return "degenerate pattern"
+
+        if self.max_chars is not None and len(text) > self.max_chars:
+            # A loop usually caused the excess; cut where it began if it shows
+            reason = self._repetition()
+            if reason:
+                return reason
+            self._keep_chars = text.rfind("\n", 0, self.max_chars) + 1 or self.max_chars
+            return "output too long for the image"
+        return None
+
+    def _repetition(self) -> Optional[str]:
+        """Reason and cut point if the output ends in a repeated line or chunk"""
+        repeated = self._repeated_line_end(self.text)
+        if repeated is not None:
+            self._keep_chars = repeated
+            return "repeated line"
+
+        start = self._periodic_tail_start(self.text)
+        if start is not None:
+            self._keep_chars = start
+            return "repeating tail"
+        return None
+
+    def _repeated_line_end(self, text: str) -> Optional[int]:
+        """End of the first copy of a line repeated at the end of the output, if any"""
+        # Walk complete lines backwards (the last line may still be growing)
+        end = text.rfind("\n")
+        last = None
+        run = 0
+        first_copy_end = None
+        while end > 0:
+            start = text.rfind("\n", 0, end) + 1
+            line = text[start:end].strip()
+            if line:
+                if last is None:
+                    last = line
+                elif line != last:
+                    break
+                run += 1
+                first_copy_end = end
+            end = start - 1
+        if run < self.max_line_repeats:
+            return None
+        return first_copy_end
+
+    def _periodic_tail_start(self, text: str) -> Optional[int]:
+        """Where the repeating tail begins, keeping one copy of the repeated chunk"""
+        length = len(text)
+        for period in range(self.min_period, self.max_period + 1):
+            repeats = max(self.min_repeats, -(-self.min_span // period))
+            span = period * repeats
+            if span > length:
+                break
+            # Cheap character test before comparing whole slices
+            if text[-1] != text[-1 - period] or text[-span:] != text[-period:] * repeats:
+                continue
+            # Walk back to the first character of the periodic region
+            start = length - span
+            while start > 0 and text[start - 1] == text[start - 1 + period]:
+                start -= 1
+            # The walk back may overshoot into the preceding text; end on a line break if the chunk has one
+            cut = start + period
+            line_end = text.find("\n", cut, cut + period)
+            return line_end if line_end >= 0 else cut
+        return None
@@ -0,0 +1,169 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+class FakeEvent:
+    """Minimal Tk event carrying canvas coordinates and modifier state"""
+
+    def __init__(self, x, y, state=0):
+        self.x = x
+        self.y = y
+        self.state = state
+
+
+class HeadlessRoot:
+    """Stand-in for the Tk root: callbacks queued with after() run in run_pending()"""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+
+    def after(self, ms, func, *args):
+        self._queue.put((time.monotonic() + ms / 1000.0, func, args))
+
+    def run_pending(self, timeout: float = 0.0) -> int:
+        """Run queued callbacks on the calling thread; waits up to timeout for the first one"""
+        ran = 0
+        block = timeout > 0
+        while True:
+            try:
+                due, func, args = self._queue.get(block=block, timeout=timeout if block else None)
+            except queue.Empty:
+                return ran
+            block = False
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            func(*args)
+            ran += 1
+
+    def withdraw(self):
+        pass
+
+    def quit(self):
+        pass
+
+    def destroy(self):
+        pass
+
+
+class HeadlessView:
+    """MainView replacement without any windows, for soak tests and trace replay
+
+    Keeps the same public interface as MainView and records what a real
+    view would display, so the controller can be driven without a display.
+    """
+
+    def __init__(self):
+        self.root: Optional[HeadlessRoot] = None
+        self.capture_open = False
+        self.screen_size = (1920, 1080)
+        self.open_jobs = {}  # job_id -> cropped image of open result tabs
+        self.job_results: Dict[int, str] = {}
+        self.job_etas: Dict[int, float] = {}  # seconds expected when the ETA was shown
+        self.job_statuses: Dict[int, str] = {}
+        self.last_job_id: Optional[int] = None
+        self.result_ready = threading.Event()
+        self.watch_transcript = []
+        self._event_handlers: Dict[str, Callable] = {}
+        self.dispatcher = None
+
+    def setup_event_handlers(self, event_handlers: Dict[str, Callable]):
+        self._event_handlers = dict(event_handlers)
+
+    def set_dispatcher(self, dispatcher):
+        self.dispatcher = dispatcher
+
+    def create_main_window(self):
+        if self.root is None:
+            self.root = HeadlessRoot()
+
+    def create_capture_window(self, screenshot):
+        self.create_main_window()
+        self.capture_open = True
+        self.screen_size = screenshot.size
+
+    def delete_current_rect(self):
+        pass
+
+    def draw_rect(self, start_x, start_y, end_x, end_y):
+        pass
+
+    def pin_current_rect(self):
+        pass
+
+    def clear_pinned_rects(self):
+        pass
+
+    def show_selection_info(self, width, height):
+        pass
+
+    def clear_selection_info(self):
+        pass
+
+    def show_screenshot_preview(self, job_id, cropped_image, selected_area):
+        self.open_jobs[job_id] = cropped_image
+        self.last_job_id = job_id
+        self.result_ready.clear()
+
+    def update_ocr_result(self, job_id, result: str, status: str = ""):
+        if job_id not in self.open_jobs:
+            return
+        self.job_results[job_id] = result
+        self.job_statuses[job_id] = status
+        self.result_ready.set()
+
+    def show_refine_pending(self, job_id, instruction: str):
+        self.job_results.pop(job_id, None)
+        self.result_ready.clear()
+
+    def show_refine_failed(self, job_id, result: str, error: str):
+        if job_id not in self.open_jobs:
+            return
+        self.job_results[job_id] = result
+        self.job_statuses[job_id] = error
+        self.result_ready.set()
+
+    def set_job_eta(self, job_id, seconds: float):
+        if job_id in self.open_jobs:
+            self.job_etas[job_id] = seconds
+
+    def release_job_image(self, job_id):
+        if job_id in self.open_jobs:
+            self.open_jobs[job_id] = None
+
+    def close_job_panel(self, job_id):
+        """Simulate the user closing a job's result tab"""
+        if self.open_jobs.pop(job_id, "closed") == "closed":
+            return
+        self.job_results.pop(job_id, None)
+        self.job_etas.pop(job_id, None)
+        self.job_statuses.pop(job_id, None)
+        handler = self._event_handlers.get('job_closed')
+        if handler:
+            handler(job_id)
+
+    def close_preview_window(self):
+        for job_id in list(self.open_jobs):
+            self.close_job_panel(job_id)
+
+    def show_watch_window(self, selected_area, on_stop: Callable):
+        self.watch_transcript = []
+
+    def append_watch_text(self, text: str):
+        self.watch_transcript.append(text)
+
+    def set_watch_status(self, text: str):
+        pass
+
+    def close_watch_window(self):
+        pass
+
+    def close_capture_window(self):
+        self.capture_open = False
+
+    def close_all_windows(self):
+        self.close_preview_window()
+        self.close_capture_window()
+        self.root = None
@@ -0,0 +1,69 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+
+class ImageBudget:
+    """Bound the number of capture images the application holds at once
+
+    Every full-screen screenshot, crop or preview copy the pipeline keeps is
+    registered under a key. When more than max_images are retained, the
+    oldest entry is evicted: its on_evict callback lets the owner drop its
+    references so the pixels can be freed.
+    """
+
+    def __init__(self, max_images: int = 3):
+        self.max_images = max_images
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.peak_count = 0
+
+    def retain(self, key, image, on_evict: Optional[Callable[[], None]] = None):
+        """Register an image held by the pipeline, evicting the oldest if over budget"""
+        evicted = []
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (image, on_evict)
+            while len(self._entries) > self.max_images:
+                evicted.append(self._entries.popitem(last=False))
+                self.evictions += 1
+            self.peak_count = max(self.peak_count, len(self._entries))
+
+        for old_key, (_, callback) in evicted:
+            print(f"[Budget] Image budget exceeded ({self.max_images}), evicting {old_key}")
+            if callback:
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"[Budget] Error evicting {old_key}: {e}")
+
+    def release(self, key):
+        """Forget an image once its owner has dropped it"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Forget every image"""
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def count(self) -> int:
+        return len(self._entries)
+
+    def held_bytes(self) -> int:
+        """Approximate decoded size of all retained images"""
+        with self._lock:
+            images = [image for image, _ in self._entries.values()]
+        total = 0
+        for image in images:
+            width, height = image.size
+            total += width * height * len(image.getbands())
+        return total
+
+    def describe(self) -> str:
+        """Summary line for status output"""
+        return (f"{self.count}/{self.max_images} images "
+                f"({self.held_bytes() / (1024 * 1024):.1f} MB), "
+                f"peak {self.peak_count}, {self.evictions} evicted")
@@ -0,0 +1,139 @@
+import math
+from functools import cached_property
+from typing import Dict, Optional, Tuple
+import numpy as np
+from PIL import Image
+
+# Crops larger than this are analysed on a nearest-neighbour sample
+SAMPLE_MAX_SIDE = 1280
+
+
+def estimate_background(gray: np.ndarray) -> int:
+    """Most common brightness along the border of a grayscale crop"""
+    border = np.concatenate((gray[0], gray[-1], gray[:, 0], gray[:, -1]))
+    return int(np.bincount(border, minlength=256).argmax())
+
+
+def ink_mask(gray: np.ndarray, background: int, ink_threshold: int) -> np.ndarray:
+    """Pixels that differ noticeably from the background colour"""
+    return (gray < background - ink_threshold) | (gray > background + ink_threshold)
+
+
+def changed_fraction(previous: np.ndarray, current: np.ndarray, pixel_threshold: int = 12) -> float:
+    """Fraction of downsampled pixels whose brightness changed noticeably"""
+    if previous.shape != current.shape:
+        return 1.0
+    changed = np.abs(current - previous) > pixel_threshold
+    return float(np.count_nonzero(changed)) / changed.size
+
+
+def hash_distance(a: int, b: int) -> int:
+    """Number of differing bits between two perceptual hashes"""
+    return bin(a ^ b).count("1")
+
+
+class ImageStats:
+    """Cheap statistics of one crop, all computed from a single grayscale array
+
+    The crop is converted to luma once - on a nearest-neighbour sample of
+    at most max_side pixels per side, which keeps a 4K crop at a few
+    milliseconds - and every statistic is a NumPy reduction over that array
+    or over a PIL view sharing its buffer. Results are memoised, so asking
+    again costs a dictionary lookup. Only the sample is kept, not the image.
+
+    A mark thinner than the sampling step (3 px on a 4K crop) can fall
+    between samples; content_trim refines edges at full resolution.
+    """
+
+    def __init__(self, image, max_side: int = SAMPLE_MAX_SIDE):
+        self.size = image.size
+        width, height = image.size
+        self.step = max(1, math.ceil(max(width, height) / max_side))
+        sample = image
+        if self.step > 1:
+            sample = image.resize((max(1, width // self.step), max(1, height // self.step)),
+                                  Image.Resampling.NEAREST)
+        self.gray = np.asarray(sample.convert('L'))
+        self._ink: Dict[int, np.ndarray] = {}
+        self._row_ink: Dict[int, np.ndarray] = {}
+        self._column_ink: Dict[int, np.ndarray] = {}
+        self._reduced: Dict[int, Image.Image] = {}
+        self._thumbnails: Dict[int, np.ndarray] = {}
+        self._dhash: Optional[int] = None
+
+    @cached_property
+    def background(self) -> int:
+        """Brightness of the background (most common along the border)"""
+        return estimate_background(self.gray)
+
+    def ink(self, ink_threshold: int = 40) -> np.ndarray:
+        """Sample pixels that differ from the background by more than ink_threshold"""
+        mask = self._ink.get(ink_threshold)
+        if mask is None:
+            mask = self._ink[ink_threshold] = ink_mask(self.gray, self.background, ink_threshold)
+        return mask
+
+    def row_ink(self, ink_threshold: int = 40) -> np.ndarray:
+        """Ink pixels per sample row"""
+        counts = self._row_ink.get(ink_threshold)
+        if counts is None:
+            counts = self._row_ink[ink_threshold] = self.ink(ink_threshold).sum(axis=1, dtype=np.int32)
+        return counts
+
+    def column_ink(self, ink_threshold: int = 40) -> np.ndarray:
+        """Ink pixels per sample column"""
+        counts = self._column_ink.get(ink_threshold)
+        if counts is None:
+            counts = self._column_ink[ink_threshold] = self.ink(ink_threshold).sum(axis=0, dtype=np.int32)
+        return counts
+
+    def ink_density(self, ink_threshold: int = 40) -> float:
+        """Fraction of the crop covered by ink"""
+        return float(self.row_ink(ink_threshold).sum()) / self.gray.size
+
+    def blank_rows(self, ink_threshold: int = 40, min_ink: int = 1) -> np.ndarray:
+        """Per sample row, True if it holds fewer than min_ink ink pixels
+
+        Row i of the sample covers crop rows i * step to (i + 1) * step.
+        """
+        return self.row_ink(ink_threshold) < min_ink
+
+    def ink_bbox(self, ink_threshold: int = 40, min_ink: int = 1) -> Optional[Tuple[int, int, int, int]]:
+        """Box (left, top, right, bottom) in crop coordinates of the sample rows and
+        columns holding at least min_ink ink pixels, or None if there are none"""
+        rows = np.flatnonzero(self.row_ink(ink_threshold) >= min_ink)
+        cols = np.flatnonzero(self.column_ink(ink_threshold) >= min_ink)
+        if rows.size == 0 or cols.size == 0:
+            return None
+        scale_x = self.size[0] / self.gray.shape[1]
+        scale_y = self.size[1] / self.gray.shape[0]
+        return (int(cols[0] * scale_x), int(rows[0] * scale_y),
+                math.ceil((cols[-1] + 1) * scale_x), math.ceil((rows[-1] + 1) * scale_y))
+
+    def _reduced_view(self, max_side: int) -> Image.Image:
+        reduced = self._reduced.get(max_side)
+        if reduced is None:
+            height, width = self.gray.shape
+            # A PIL image over the array's own buffer, no copy
+            view = Image.frombuffer('L', (width, height), self.gray, 'raw', 'L', 0, 1)
+            factor = max(1, max(width, height) // max_side)
+            reduced = self._reduced[max_side] = view.reduce(factor) if factor > 1 else view
+        return reduced
+
+    def thumbnail(self, max_side: int = 320) -> np.ndarray:
+        """Box-filtered grayscale thumbnail (int16) for change detection"""
+        thumbnail = self._thumbnails.get(max_side)
+        if thumbnail is None:
+            thumbnail = self._thumbnails[max_side] = np.asarray(self._reduced_view(max_side), dtype=np.int16)
+        return thumbnail
+
+    def dhash(self) -> int:
+        """64-bit difference hash: whether brightness rises between neighbours of a 9x8 thumbnail"""
+        if self._dhash is None:
+            small = np.asarray(self._reduced_view(320).resize((9, 8), Image.Resampling.BOX), dtype=np.int16)
+            self._dhash = int.from_bytes(np.packbits(small[:, 1:] > small[:, :-1]).tobytes(), 'big')
+        return self._dhash
+
+    def changed_fraction(self, other: "ImageStats", pixel_threshold: int = 12) -> float:
+        """Fraction of thumbnail pixels that differ noticeably from another crop's"""
+        return changed_fraction(other.thumbnail(), self.thumbnail(), pixel_threshold)
@@ -0,0 +1,229 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from io import BytesIO
+from typing import List, NamedTuple, Optional, Tuple
+from PIL import Image
+from app_paths import get_app_dir
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    area TEXT NOT NULL,
+    status TEXT NOT NULL,
+    submitted_at REAL NOT NULL,
+    completed_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 1,
+    result TEXT
+);
+CREATE TABLE IF NOT EXISTS images (
+    key TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    png BLOB NOT NULL,
+    PRIMARY KEY (key, idx)
+);
+"""
+
+PENDING = "pending"
+DONE = "done"
+CANCELLED = "cancelled"
+ABANDONED = "abandoned"
+
+
+class JournaledJob(NamedTuple):
+    """An unfinished job read back from the journal"""
+    key: str
+    kind: str  # "single" or "regions"
+    area: Tuple[int, int, int, int]
+    images: List[Image.Image]
+    attempts: int
+
+
+class JobJournal:
+    """Append-only journal of OCR jobs in SQLite (WAL), for resuming after a crash
+
+    Submissions (with their crops as PNG), results and cancellations are
+    queued and written by one worker thread, which commits everything
+    queued so far in one transaction - one fsync per batch instead of per
+    job, and the caller only pays for a queue put. A crash loses at most
+    the batch being written.
+
+    Finished jobs lose their images at once; rows older than retention are
+    deleted and the WAL truncated every compact_every results and on open.
+    """
+
+    def __init__(self, path: Optional[str] = None, retention: float = 7 * 24 * 3600,
+                 compact_every: int = 200):
+        self.path = path or os.path.join(get_app_dir(), 'jobs.sqlite3')
+        self.retention = retention
+        self.compact_every = compact_every
+        self.stats = {'submitted': 0, 'completed': 0, 'batches': 0, 'compactions': 0}
+        self._since_compaction = 0
+        self._queue = queue.Queue()
+
+        connection = self._connect()
+        connection.executescript(SCHEMA)
+        self._compact(connection)
+        connection.close()
+
+        self._thread = threading.Thread(target=self._write_loop, name="JobJournal", daemon=True)
+        self._thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # FULL: each commit is fsynced, so a committed batch survives power loss
+        connection.execute("PRAGMA synchronous=FULL")
+        return connection
+
+    def submit(self, kind: str, area, images) -> str:
+        """Record a submitted job with its crops; returns the journal key"""
+        key = uuid.uuid4().hex
+        self.stats['submitted'] += 1
+        self._queue.put(("submit", key, kind, list(area), list(images), time.time()))
+        return key
+
+    def complete(self, key: str, result: str):
+        """Record a job's result (again for refinements)"""
+        self.stats['completed'] += 1
+        self._queue.put(("complete", key, result, time.time()))
+
+    def cancel(self, key: str):
+        """Record that the user gave up on a job; it is not resumed"""
+        self._queue.put(("cancel", key, time.time()))
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything queued so far is committed"""
+        committed = threading.Event()
+        self._queue.put(("flush", committed))
+        return committed.wait(timeout)
+
+    def close(self):
+        """Commit what is queued and stop the writer"""
+        self._queue.put(None)
+        self._thread.join(10.0)
+
+    def _write_loop(self):
+        connection = self._connect()
+        try:
+            while True:
+                batch = [self._queue.get()]
+                # Everything queued meanwhile goes into the same transaction
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stop = None in batch
+                self._write_batch(connection, [op for op in batch if op is not None])
+                if stop:
+                    return
+        finally:
+            connection.close()
+
+    def _write_batch(self, connection: sqlite3.Connection, batch):
+        flushes = []
+        try:
+            connection.execute("BEGIN")
+            for op in batch:
+                if op[0] == "submit":
+                    _, key, kind, area, images, submitted_at = op
+                    connection.execute(
+                        "INSERT OR REPLACE INTO jobs (key, kind, area, status, submitted_at) VALUES (?, ?, ?, ?, ?)",
+                        (key, kind, json.dumps(area), PENDING, submitted_at))
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO images (key, idx, png) VALUES (?, ?, ?)",
+                        [(key, index, _encode_png(image)) for index, image in enumerate(images)])
+                elif op[0] == "complete":
+                    _, key, result, completed_at = op
+                    connection.execute("UPDATE jobs SET status = ?, result = ?, completed_at = ? WHERE key = ?",
+                                       (DONE, result, completed_at, key))
+                    connection.execute("DELETE FROM images WHERE key = ?", (key,))
+                    self._since_compaction += 1
+                elif op[0] == "cancel":
+                    _, key, completed_at = op
+                    connection.execute(
+                        "UPDATE jobs SET status = ?, completed_at = ? WHERE key = ? AND status = ?",
+                        (CANCELLED, completed_at, key, PENDING))
+                    connection.execute("DELETE FROM images WHERE key = ?", (key,))
+                elif op[0] == "flush":
+                    flushes.append(op[1])
+            connection.execute("COMMIT")
+            self.stats['batches'] += 1
+        except Exception as e:
+            print(f"[Journal] Write failed, {len(batch)} records lost: {e}")
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            # Nothing was committed - flush() waiters time out and report False
+            return
+        if self._since_compaction >= self.compact_every:
+            self._compact(connection)
+        for committed in flushes:
+            committed.set()
+
+    def _compact(self, connection: sqlite3.Connection):
+        """Delete old finished jobs and orphaned images, then truncate the WAL"""
+        self._since_compaction = 0
+        try:
+            cutoff = time.time() - self.retention
+            connection.execute("DELETE FROM jobs WHERE status != ? AND completed_at < ?", (PENDING, cutoff))
+            connection.execute("DELETE FROM images WHERE key NOT IN (SELECT key FROM jobs WHERE status = ?)",
+                               (PENDING,))
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.stats['compactions'] += 1
+        except sqlite3.Error as e:
+            print(f"[Journal] Compaction failed: {e}")
+
+    def unfinished_jobs(self, max_attempts: int = 3, max_age: float = 24 * 3600) -> List[JournaledJob]:
+        """Jobs submitted but never finished, oldest first, counted as one more attempt
+
+        Jobs that already failed to finish max_attempts times, or are older
+        than max_age seconds, are marked abandoned instead of being resumed.
+        Call before new jobs are submitted.
+        """
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT key, kind, area, submitted_at, attempts FROM jobs WHERE status = ? ORDER BY submitted_at",
+                (PENDING,)).fetchall()
+            jobs = []
+            connection.execute("BEGIN")
+            for key, kind, area, submitted_at, attempts in rows:
+                if attempts >= max_attempts or time.time() - submitted_at > max_age:
+                    print(f"[Journal] Abandoning job {key[:8]} ({attempts} attempts)")
+                    connection.execute("UPDATE jobs SET status = ?, completed_at = ? WHERE key = ?",
+                                       (ABANDONED, time.time(), key))
+                    connection.execute("DELETE FROM images WHERE key = ?", (key,))
+                    continue
+                pngs = connection.execute("SELECT png FROM images WHERE key = ? ORDER BY idx", (key,)).fetchall()
+                if not pngs:
+                    continue
+                images = [_decode_png(png) for (png,) in pngs]
+                connection.execute("UPDATE jobs SET attempts = attempts + 1 WHERE key = ?", (key,))
+                jobs.append(JournaledJob(key, kind, tuple(json.loads(area)), images, attempts + 1))
+            connection.execute("COMMIT")
+            return jobs
+        finally:
+            connection.close()
+
+    def describe(self) -> str:
+        """Summary line for status output"""
+        return (f"{self.stats['submitted']} submitted, {self.stats['completed']} results, "
+                f"{self.stats['batches']} commits")
+
+
+def _encode_png(image) -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, format='PNG', compress_level=1)
+    return buffer.getvalue()
+
+
+def _decode_png(data: bytes) -> Image.Image:
+    image = Image.open(BytesIO(data))
+    image.load()
+    return image
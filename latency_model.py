@@ -0,0 +1,163 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+import numpy as np
+
+# Features: intercept, crop megapixels, request payload megabytes
+FEATURE_COUNT = 3
+
+
+def features(pixels: Optional[int], payload_bytes: int) -> np.ndarray:
+    return np.array([1.0, (pixels or 0) / 1e6, payload_bytes / 1e6])
+
+
+class _Fit:
+    """Recursive least squares for one endpoint/model pair, with exponential forgetting"""
+
+    def __init__(self, state: Optional[Dict] = None):
+        state = state or {}
+        self.weights = np.array(state.get('weights', [0.0] * FEATURE_COUNT))
+        self.covariance = np.array(state.get('covariance', (np.eye(FEATURE_COUNT) * 100.0).tolist()))
+        self.samples = state.get('samples', 0)
+        self.mean_latency = state.get('mean_latency', 0.0)
+        self.bytes_per_pixel = state.get('bytes_per_pixel', 0.0)
+        self.updated_at = state.get('updated_at', time.time())
+
+    def update(self, x: np.ndarray, latency: float, forgetting: float):
+        px = self.covariance @ x
+        gain = px / (forgetting + x @ px)
+        self.weights = self.weights + gain * (latency - self.weights @ x)
+        self.covariance = (self.covariance - np.outer(gain, px)) / forgetting
+        self.samples += 1
+        self.mean_latency += (latency - self.mean_latency) / min(self.samples, 20)
+        self.updated_at = time.time()
+
+    def state(self) -> Dict:
+        return {
+            'weights': self.weights.tolist(),
+            'covariance': self.covariance.tolist(),
+            'samples': self.samples,
+            'mean_latency': self.mean_latency,
+            'bytes_per_pixel': self.bytes_per_pixel,
+            'updated_at': self.updated_at,
+        }
+
+
+class LatencyModel:
+    """Online estimate of OCR request latency per endpoint and model
+
+    Fits latency against crop pixels and request payload size from the
+    requests the service completes, forgetting old samples slowly so the
+    fit follows model or hardware changes. Until min_samples requests have
+    been seen, the running mean latency is used instead.
+
+    Every prediction that is later observed is scored; describe() reports
+    the median and p90 relative error of the recent ones. The fit is saved
+    to path (JSON) every save_every observations and on close; path None
+    keeps it in memory only.
+    """
+
+    def __init__(self, path: Optional[str] = None, forgetting: float = 0.98, min_samples: int = 5,
+                 save_every: int = 10, max_keys: int = 20):
+        self.path = path
+        self.forgetting = forgetting
+        self.min_samples = min_samples
+        self.save_every = save_every
+        self.max_keys = max_keys
+        self.errors = deque(maxlen=200)  # relative errors of recent predictions
+        self._fits: Dict[str, _Fit] = {}
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def _key(endpoint: str, model: str) -> str:
+        return f"{model} @ {endpoint}"
+
+    def predict(self, endpoint: str, model: str, pixels: Optional[int],
+                payload_bytes: Optional[int] = None) -> Optional[float]:
+        """Expected seconds for one request, or None before the first observation
+
+        Without payload_bytes (image not encoded yet) the size is estimated
+        from the bytes per pixel seen so far.
+        """
+        with self._lock:
+            fit = self._fits.get(self._key(endpoint, model))
+            if fit is None or fit.samples == 0:
+                return None
+            if payload_bytes is None:
+                payload_bytes = int((pixels or 0) * fit.bytes_per_pixel)
+            if fit.samples < self.min_samples:
+                return fit.mean_latency
+            estimate = float(fit.weights @ features(pixels, payload_bytes))
+        # A young fit can extrapolate below zero for tiny requests
+        return max(estimate, 0.1 * fit.mean_latency)
+
+    def observe(self, endpoint: str, model: str, pixels: Optional[int], payload_bytes: int,
+                latency: float, predicted: Optional[float] = None):
+        """Add the measured latency of a completed request"""
+        if predicted is not None and latency > 0:
+            self.errors.append(abs(predicted - latency) / latency)
+        with self._lock:
+            key = self._key(endpoint, model)
+            fit = self._fits.get(key)
+            if fit is None:
+                fit = self._fits[key] = _Fit()
+            fit.update(features(pixels, payload_bytes), latency, self.forgetting)
+            if pixels:
+                fit.bytes_per_pixel += (payload_bytes / pixels - fit.bytes_per_pixel) / min(fit.samples, 20)
+            self._unsaved += 1
+        if self._unsaved >= self.save_every:
+            self.save()
+
+    def error_summary(self) -> Optional[Dict[str, float]]:
+        """Median and p90 relative error of recent predictions"""
+        if not self.errors:
+            return None
+        ordered = sorted(self.errors)
+        return {
+            'count': len(ordered),
+            'median': ordered[len(ordered) // 2],
+            'p90': ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))],
+        }
+
+    def describe(self) -> str:
+        """Summary line for status output"""
+        samples = sum(fit.samples for fit in self._fits.values())
+        if not samples:
+            return "No requests observed yet"
+        errors = self.error_summary()
+        if errors is None:
+            return f"{samples} requests observed"
+        return (f"{samples} requests observed, prediction error median {errors['median']:.0%}, "
+                f"p90 {errors['p90']:.0%}")
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                saved = json.load(f)
+            self._fits = {key: _Fit(state) for key, state in saved.get('fits', {}).items()}
+            print(f"[Latency] Loaded latency model ({len(self._fits)} endpoint/model pairs)")
+        except (OSError, ValueError, TypeError) as e:
+            print(f"[Latency] Ignoring unreadable latency model: {e}")
+
+    def save(self):
+        """Write the fit to disk (keeps the most recently used pairs)"""
+        with self._lock:
+            self._unsaved = 0
+            if not self.path:
+                return
+            recent = sorted(self._fits.items(), key=lambda item: item[1].updated_at, reverse=True)
+            state = {'fits': {key: fit.state() for key, fit in recent[:self.max_keys]}}
+        try:
+            temp_path = self.path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"[Latency] Could not save latency model: {e}")
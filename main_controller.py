@@ -1,57 +1,188 @@
+import os
+import signal
+import socket
 import threading
 import time
+from collections import deque
 import keyboard
-import pyautogui
+from PIL import Image
 from main_view import MainView
-from ocr_service import OCRService
-from system_tray import SystemTrayManager
+from ocr_service import OCRService, OCRConversation, is_error_result
+from deadline import Deadline
+from tk_bridge import TkDispatcher
+from region_watcher import RegionWatcher
+from image_budget import ImageBudget
+from ocr_job import OCRJob
+from profiler import ProfilingSession
+from content_trim import trim_to_content
+from multi_region import reading_order, bounding_area, stack_regions, format_region_results
+from session_trace import SessionRecorder
+from job_journal import JobJournal
+from latency_model import LatencyModel
+from model_stats import ModelStats
+from app_paths import get_app_dir, get_diagnostics_dir
+
+# Tk event.state bit for the Shift key
+SHIFT_MASK = 0x0001
 
 class MainController:
-    def __init__(self):
-        self.mainView = MainView()
+    def __init__(self, headless=False):
+        self.headless = headless
+        if headless:
+            # No windows, tray or screen access - used by soak tests and trace replay
+            from headless_view import HeadlessView
+            self.mainView = HeadlessView()
+            self.system_tray = None
+        else:
+            # pystray needs a display at import time, so import it only when used
+            from system_tray import SystemTrayManager
+            self.mainView = MainView()
+            self.system_tray = SystemTrayManager(self)
         self.ocrService = OCRService()
-        self.system_tray = SystemTrayManager(self)
+        if not headless:
+            # Latency estimates survive restarts; test and replay timings stay in memory
+            self.ocrService.latency_model = LatencyModel(os.path.join(get_app_dir(), 'latency_model.json'))
+            # Ollama's per-request counters are logged, throughput baselines kept across upgrades
+            self.ocrService.model_stats = ModelStats(os.path.join(get_app_dir(), 'model_baselines.json'),
+                                                     os.path.join(get_diagnostics_dir(), 'model_stats.jsonl'))
+        
+        # Results from worker threads reach Tk through this queue
+        self.dispatcher = TkDispatcher(self.mainView)
+        self.mainView.set_dispatcher(self.dispatcher)
         
         self.screenshot = None
         self.start_x = None
         self.start_y = None
         self.selected_area = None
+        # Earlier selections kept with Shift-drag, submitted together on Enter
+        self.pinned_areas = []
         self.is_capturing = False
-        self.is_running = True
+        
+        # Set once on shutdown; threads block on it instead of polling a flag
+        self.shutdown_event = threading.Event()
+        # Set when cleanup() has saved and closed everything (profile, trace, journal...)
+        self.shutdown_complete = threading.Event()
+        
+        # End-to-end budget for one OCR job (seconds); None sizes it per job
+        # (OCRService.job_budget: expected latency, cold-start allowance)
+        self.ocr_budget = None
+        
+        # Delay before grabbing the screen so the hotkey release is not captured
+        self.hotkey_release_delay = 0.1
+        self.grab_screen = self._grab_full_screen
+        
+        # Clipboard fast path: OCR a copied image without screen capture, overlay or selection
+        self.clipboard_hotkey = 'f2'
+        self.grab_clipboard = self._grab_clipboard_image
+        
+        # End-to-end latency per input path: screen (F1 to overlay, Enter to result)
+        # and clipboard (hotkey to preview, hotkey to result)
+        self.path_latency = {path: {'ready': deque(maxlen=200), 'result': deque(maxlen=200)}
+                             for path in ('screen', 'clipboard')}
+        
+        # Upper bound on screenshots/crops held by the capture pipeline at once
+        self.max_live_images = 4
+        self.image_budget = ImageBudget(self.max_live_images)
+        
+        # OCR jobs with an open result tab, by job ID
+        self.jobs = {}
+        
+        # Crash-safe journal of submitted jobs; unfinished ones are resumed on the next start
+        self.job_journal = None if headless else JobJournal()
+        
+        # Trim background margins off crops before OCR (fewer pixels to encode and tokenize)
+        self.trim_margins = True
+        self.trim_pad = 8
+        self.trim_stats = {'captures': 0, 'pixels_before': 0, 'pixels_after': 0}
+        
+        # Speculative OCR: submit the job on mouse release and adopt it on Enter
+        self.speculative_ocr = False
+        self.speculative_job = None
+        self.speculation_stats = {'started': 0, 'adopted': 0, 'discarded': 0, 'wasted_seconds': 0.0}
+        
+        # Opt-in session trace (events, crops, OCR timings) for headless replay
+        self.trace_recorder = None
+        
+        # On-demand profiling; cProfile is enabled on the Tk and OCR loop threads
+        self.profiler = ProfilingSession([self.dispatcher.post, self.ocrService.core.call_soon])
+        
+        # Region watch mode: recapture interval (seconds) and change threshold (fraction of pixels)
+        self.watch_requested = False
+        self.region_watcher = None
+        self.watch_interval = 1.0
+        self.watch_change_threshold = 0.0001
+        
+        # Mirror OCR backend health in the tray
+        if self.system_tray:
+            self.ocrService.circuit_breaker.add_listener(self.system_tray.update_backend_status)
+            self.ocrService.model_stats.add_listener(self.system_tray.show_throughput_alert)
         
         # Setup event handlers
         event_handlers = {
             'mouse_down': self.on_mouse_down,
             'mouse_drag': self.on_mouse_drag,
             'mouse_up': self.on_mouse_up,
-            'keyboard_confirm': self.on_keyboard_confirm
+            'keyboard_confirm': self.on_keyboard_confirm,
+            'job_closed': self.on_job_closed,
+            'job_refine': self.on_job_refine
         }
         
         self.mainView.setup_event_handlers(event_handlers)
         
         print("[Controller] OCR screenshot tool initialized with system tray")
         
+    @property
+    def is_running(self):
+        """True until shutdown has been requested"""
+        return not self.shutdown_event.is_set()
+    
     def _setup_hotkey(self):
-        """Setup hotkey monitoring in separate thread"""
-        # Register F1 for screenshot
+        """Register global hotkeys
+        
+        The keyboard library delivers hotkeys from its own listener thread,
+        which blocks on OS events - nothing here needs to poll.
+        """
+        # Register F1 for screenshot (grabs the screen off the Tk thread, then posts to it)
         keyboard.add_hotkey('f1', self.start_screenshot)
         print("[Controller] F1 hotkey registered")
         
-        # Register ESC for cancel/exit (global hotkey)
-        keyboard.add_hotkey('esc', self.global_cancel)
-        print("[Controller] ESC hotkey registered (global cancel)")
+        # Clipboard image OCR (reads the clipboard on the listener thread, then posts to Tk)
+        keyboard.add_hotkey(self.clipboard_hotkey, self.start_clipboard_ocr)
+        print(f"[Controller] {self.clipboard_hotkey.upper()} hotkey registered (clipboard image OCR)")
         
-        # Keep hotkey monitoring active
+        # Register ESC for cancel/exit (global hotkey) - touches Tk widgets, so run it on the Tk thread
+        keyboard.add_hotkey('esc', lambda: self.dispatcher.post(self.global_cancel))
+        print("[Controller] ESC hotkey registered (global cancel)")
+    
+    def _install_interrupt_wakeup(self):
+        """Let Ctrl+C stop a main loop that is blocked inside Tk, without polling
+        
+        Python signal handlers only run when the main thread executes Python
+        code, which an idle Tk main loop never does. The C-level handler also
+        writes to the wakeup fd, so a helper thread blocked on it can request
+        shutdown through the command queue.
+        """
         try:
-            while self.is_running:
-                time.sleep(0.1)  # Avoid blocking with keyboard.wait()
-        except KeyboardInterrupt:
-            print("[Controller] Hotkey monitoring stopped")
+            reader, writer = socket.socketpair()
+            writer.setblocking(False)
+            signal.set_wakeup_fd(writer.fileno())
+            signal.signal(signal.SIGINT, lambda signum, frame: None)
+        except (ValueError, OSError) as e:
+            print(f"[Controller] Ctrl+C wakeup not available: {e}")
+            return
+        
+        def wait_for_interrupt():
+            reader.recv(1)
+            print("\n[Controller] Program interrupted by user")
+            self.quit_threaded()
+        
+        threading.Thread(target=wait_for_interrupt, name="InterruptWakeup", daemon=True).start()
     
     def global_cancel(self):
         """Handle global ESC key - cancel operation or show status"""
         if self.is_capturing:
             print("[Controller] Global ESC - Cancelling screenshot operation")
+            self._trace("cancel")
             self.cancel_screenshot()
         else:
             print("[Controller] Global ESC - No active operation to cancel")
@@ -65,6 +196,19 @@ class MainController:
             f"[Controller] Capturing: {'Yes' if self.is_capturing else 'No'}",
             f"[Controller] Screenshot ready: {'Yes' if self.screenshot else 'No'}",
             f"[Controller] Selected area: {'Yes' if self.selected_area else 'No'}",
+            f"[Controller] OCR jobs: {self._job_summary()}",
+            f"[Controller] Speculative OCR: {self._speculation_summary()}",
+            f"[Controller] Input paths: {self._path_latency_summary()}",
+            f"[Controller] Margin trim: {self._trim_summary()}",
+            f"[Controller] Images held: {self.image_budget.describe()}",
+            f"[Controller] Profiling: {self.profiler.describe()}",
+            f"[Controller] Job journal: {self.job_journal.describe() if self.job_journal else 'Off'}",
+            f"[Controller] Session trace: {self.trace_recorder.describe() if self.trace_recorder else 'Off'}",
+            f"[Controller] OCR backend: {self.ocrService.circuit_breaker.describe()}",
+            f"[Controller] Generation guard: {self.ocrService.describe_guard()}",
+            f"[Controller] Latency model: {self.ocrService.latency_model.describe()}",
+            f"[Controller] Model statistics: {self.ocrService.model_stats.describe()}",
+            f"[Controller] Watch mode: {self.region_watcher.describe() if self.region_watcher else 'Off'}",
             "[Controller] Commands:",
             "[Controller]   F1  - Start screenshot",
             "[Controller]   ESC - Cancel operation",
@@ -83,33 +227,119 @@ class MainController:
             
         print("[Controller] Starting screenshot capture")
         self.is_capturing = True
+        requested_at = time.monotonic()
         
         # Small delay to ensure hotkey release
-        time.sleep(0.1)
+        if self.hotkey_release_delay:
+            time.sleep(self.hotkey_release_delay)
         
         # Take full screen screenshot
-        self.screenshot = pyautogui.screenshot()
+        self.screenshot = self.grab_screen()
+        self.image_budget.retain('screenshot', self.screenshot, on_evict=self.cancel_screenshot)
+        self._trace("capture", screen=list(self.screenshot.size), watch=self.watch_requested)
         print(f"[Controller] Screenshot captured, size: {self.screenshot.size}")
         
         # Create capture window through view (execute in main thread)
-        if self.mainView.root:
-            self.mainView.root.after(0, lambda: self.mainView.create_capture_window(self.screenshot))
+        self.dispatcher.post(self._open_capture_window, self.screenshot, requested_at)
+    
+    def _open_capture_window(self, screenshot, requested_at):
+        """Show the selection overlay (Tk thread)"""
+        self.mainView.create_capture_window(screenshot)
+        self.path_latency['screen']['ready'].append(time.monotonic() - requested_at)
+    
+    def _grab_full_screen(self):
+        """Capture the whole screen"""
+        import pyautogui
+        return pyautogui.screenshot()
+    
+    def start_clipboard_ocr(self):
+        """OCR the image on the clipboard - no screen capture, overlay or drag"""
+        requested_at = time.monotonic()
+        image = self.grab_clipboard()
+        if image is None:
+            print("[Controller] No image on the clipboard")
+            return
+        print(f"[Controller] Clipboard image {image.width}x{image.height} read in "
+              f"{(time.monotonic() - requested_at) * 1000:.0f}ms")
+        if self.trace_recorder:
+            self.trace_recorder.record_clipboard(image)
+        self.dispatcher.post(self.process_clipboard_image, image, requested_at)
+    
+    def _grab_clipboard_image(self):
+        """Image on the clipboard (or the first copied image file), None if there is none"""
+        from PIL import ImageGrab
+        try:
+            content = ImageGrab.grabclipboard()
+        except Exception as e:
+            # Linux needs wl-paste or xclip
+            print(f"[Controller] Cannot read the clipboard: {e}")
+            return None
+        if isinstance(content, list):
+            # Copied files (Windows/macOS file managers)
+            for path in content:
+                try:
+                    with Image.open(path) as image:
+                        return image.copy()
+                except OSError:
+                    continue
+            return None
+        return content
+    
+    def process_clipboard_image(self, image, requested_at):
+        """Open a job for a clipboard image and start OCR right away (Tk thread)"""
+        if image.mode in ('RGBA', 'LA', 'P'):
+            # Transparent areas (copied from browsers) become white, like a page
+            rgba = image.convert('RGBA')
+            image = Image.new('RGB', rgba.size, 'white')
+            image.paste(rgba, mask=rgba.getchannel('A'))
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+        area = (0, 0, image.width, image.height)
+        
+        # Same pipeline as a screen selection: trim, job, journal, OCR
+        job = self._create_job(self._trim_crop(image), area, source="clipboard")
+        job.confirmed_at = requested_at
+        self.jobs[job.job_id] = job
+        self._trace("job_started", job_id=job.job_id, source="clipboard")
+        self._journal_submit(job, "single", [job.image])
+        self.mainView.show_screenshot_preview(job.job_id, job.image, area)
+        self.path_latency['clipboard']['ready'].append(time.monotonic() - requested_at)
+        self.start_ocr_recognition(job)
+        self._show_eta(job)
+    
+    def release_screenshot(self):
+        """Drop the full-screen screenshot so its buffer can be freed"""
+        self.screenshot = None
+        self.image_budget.release('screenshot')
     
     def on_mouse_down(self, event):
         """Handle mouse down event"""
         self.start_x = event.x
         self.start_y = event.y
+        self._trace("mouse_down", x=event.x, y=event.y, state=getattr(event, 'state', 0))
+        if getattr(event, 'state', 0) & SHIFT_MASK:
+            # Shift-drag adds a region: keep the current selection
+            if self.selected_area:
+                self._discard_speculative_job()
+                self.pinned_areas.append(self.selected_area)
+                self.selected_area = None
+                self.mainView.pin_current_rect()
+        elif self.pinned_areas:
+            self.pinned_areas = []
+            self.mainView.clear_pinned_rects()
         self.mainView.delete_current_rect()
         print(f"[Controller] Mouse down at ({event.x}, {event.y})")
             
     def on_mouse_drag(self, event):
         """Handle mouse drag event"""
+        self._trace("mouse_drag", x=event.x, y=event.y)
         if self.start_x is not None and self.start_y is not None:
             self.mainView.delete_current_rect()
             self.mainView.draw_rect(self.start_x, self.start_y, event.x, event.y)
             
     def on_mouse_up(self, event):
         """Handle mouse up event"""
+        self._trace("mouse_up", x=event.x, y=event.y)
         if self.start_x is not None and self.start_y is not None:
             end_x, end_y = event.x, event.y
             
@@ -127,13 +357,24 @@ class MainController:
                 self.selected_area = (left, top, right, bottom)
                 print(f"[Controller] Valid area selected: {width}x{height} pixels")
                 self.mainView.show_selection_info(width, height)
+                if self.speculative_ocr and not self.watch_requested and not self.pinned_areas:
+                    self._start_speculative_job()
             else:
                 print(f"[Controller] Area too small: {width}x{height} pixels (minimum 5x5)")
         
     def on_keyboard_confirm(self, event):
         """Handle Enter key - confirm selection"""
         print("[Controller] Confirm selection triggered")
-        if self.selected_area:
+        self._trace("confirm")
+        regions = self.pinned_areas + ([self.selected_area] if self.selected_area else [])
+        if self.selected_area and self.watch_requested:
+            print(f"[Controller] Watching selected area: {self.selected_area}")
+            self.start_region_watch()
+        elif len(regions) > 1:
+            print(f"[Controller] Processing {len(regions)} selected areas")
+            self.process_selected_regions(regions)
+        elif regions:
+            self.selected_area = regions[0]
             print(f"[Controller] Processing selected area: {self.selected_area}")
             self.process_selected_area()
         else:
@@ -154,38 +395,404 @@ class MainController:
         print(f"[Controller] Screenshot size: {self.screenshot.size}")
         print(f"[Controller] Selected area: {self.selected_area}")
         
-        # Extract selected area from screenshot
-        cropped_image = self.screenshot.crop(self.selected_area)
+        # Reuse the job already started for this selection, if any
+        job = self._adopt_speculative_job()
+        if job is None:
+            # Extract selected area from screenshot
+            job = self._create_job(self._crop_selection(self.selected_area), self.selected_area)
+        cropped_image = job.image
         print(f"[Controller] Cropped image size: {cropped_image.size}")
+        self.jobs[job.job_id] = job
+        self._trace("job_started", job_id=job.job_id, speculative=job.speculative)
+        self._journal_submit(job, "single", [cropped_image])
+        
+        # The full-screen buffers are not needed once the crop is taken
+        self.release_screenshot()
         
-        # Close capture window first (only UI cleanup)
+        # Close capture window first (only UI cleanup, drops the full-screen PhotoImage)
         print("[Controller] Closing capture window")
         self.close_capture_window()
         
-        # Show screenshot preview in new window
-        print("[Controller] Showing screenshot preview")
-        self.mainView.show_screenshot_preview(cropped_image, self.selected_area)
+        # Show screenshot preview in the job's tab
+        print(f"[Controller] Showing screenshot preview for job #{job.job_id}")
+        self.mainView.show_screenshot_preview(job.job_id, cropped_image, self.selected_area)
         
-        # Start OCR recognition asynchronously
-        print("[Controller] Starting OCR recognition")
-        self.start_ocr_recognition(cropped_image)
+        if job.future is None:
+            # Start OCR recognition asynchronously
+            print("[Controller] Starting OCR recognition")
+            self.start_ocr_recognition(job)
+        elif not job.is_pending:
+            # Speculative job finished before the user confirmed
+            self.mainView.update_ocr_result(job.job_id, job.result)
+        self._show_eta(job)
         
         # Reset controller state after preview is shown
         print("[Controller] Resetting controller state")
         self.reset_controller_state()
     
-    def start_ocr_recognition(self, image):
-        """Start OCR recognition for the cropped image"""
+    def _crop_selection(self, area):
+        """Crop a selected area from the screenshot, trimmed to its content"""
+        cropped_image = self.screenshot.crop(area)
+        if self.trace_recorder:
+            self.trace_recorder.record_crop(area, cropped_image)
+        return self._trim_crop(cropped_image)
+    
+    def _trim_crop(self, cropped_image):
+        """Trim a crop to its content (if margin trimming is on)"""
+        if not self.trim_margins:
+            return cropped_image
+        
+        started = time.perf_counter()
+        trimmed, box = trim_to_content(cropped_image, self.trim_pad)
+        elapsed = time.perf_counter() - started
+        
+        before = cropped_image.width * cropped_image.height
+        after = trimmed.width * trimmed.height
+        self.trim_stats['captures'] += 1
+        self.trim_stats['pixels_before'] += before
+        self.trim_stats['pixels_after'] += after
+        print(f"[Controller] Trimmed crop {cropped_image.width}x{cropped_image.height} -> "
+              f"{trimmed.width}x{trimmed.height} ({1 - after / before:.0%} fewer pixels, "
+              f"{elapsed * 1000:.1f}ms)")
+        return trimmed
+    
+    def _trim_summary(self):
+        """Pixels saved by margin trimming so far"""
+        if not self.trim_margins:
+            return "Off"
+        stats = self.trim_stats
+        if not stats['captures']:
+            return "On, no captures yet"
+        saved = stats['pixels_before'] - stats['pixels_after']
+        return (f"{saved / stats['captures'] / 1e6:.2f} MP saved per capture "
+                f"({saved / stats['pixels_before']:.0%} of selected pixels)")
+    
+    def _create_job(self, cropped_image, selected_area, speculative=False, source="screen"):
+        """Wrap a crop in an OCR job and hold it in the image budget"""
+        job = OCRJob(cropped_image, selected_area, source=source, speculative=speculative)
+        self.image_budget.retain(f"job:{job.job_id}", cropped_image,
+                                 on_evict=lambda: self.release_job_image(job.job_id))
+        return job
+    
+    def _start_speculative_job(self):
+        """Submit OCR for the current selection before the user confirms it"""
+        job = self.speculative_job
+        if job and job.selected_area == self.selected_area:
+            return
+        self._discard_speculative_job()
+        
+        job = self._create_job(self._crop_selection(self.selected_area), self.selected_area,
+                               speculative=True)
+        self.speculative_job = job
+        self.speculation_stats['started'] += 1
+        print(f"[Controller] Speculative OCR started as job #{job.job_id}")
+        self.start_ocr_recognition(job)
+    
+    def _adopt_speculative_job(self):
+        """Take over the speculative job if it matches the confirmed selection"""
+        job = self.speculative_job
+        if job is None or job.selected_area != self.selected_area:
+            return None
+        self.speculative_job = None
+        job.confirm()
+        self.speculation_stats['adopted'] += 1
+        print(f"[Controller] Adopting speculative job #{job.job_id} ({job.status})")
+        return job
+    
+    def _discard_speculative_job(self):
+        """Cancel a speculative job whose selection was changed or abandoned"""
+        job = self.speculative_job
+        if job is None:
+            return
+        self.speculative_job = None
+        if job.is_pending:
+            job.cancel()
+        self.speculation_stats['discarded'] += 1
+        self.speculation_stats['wasted_seconds'] += job.latency() or 0.0
+        self.image_budget.release(f"job:{job.job_id}")
+        print(f"[Controller] Speculative job #{job.job_id} discarded")
+    
+    def _speculation_summary(self):
+        """Hit rate and wasted OCR time of speculative jobs"""
+        if not self.speculative_ocr:
+            return "Off"
+        stats = self.speculation_stats
+        hit_rate = stats['adopted'] / stats['started'] if stats['started'] else 0.0
+        return (f"{stats['adopted']}/{stats['started']} adopted ({hit_rate:.0%}), "
+                f"{stats['wasted_seconds']:.1f}s OCR time wasted")
+    
+    def process_selected_regions(self, areas):
+        """Process several selected areas as one job with per-region results"""
+        if not self.screenshot:
+            raise ValueError("No screenshot available - this should not happen")
+        
+        areas = reading_order(areas)
+        crops = [self._crop_selection(area) for area in areas]
+        self.release_screenshot()
+        self.close_capture_window()
+        
+        job = self._start_regions_job(crops, bounding_area(areas))
+        self._trace("job_started", job_id=job.job_id, regions=len(crops))
+        self._journal_submit(job, "regions", crops)
+        self.reset_controller_state()
+    
+    def _start_regions_job(self, crops, selected_area):
+        """Open a tab for a multi-region job and start recognizing its crops"""
+        # The tab previews the regions stacked in reading order
+        job = self._create_job(stack_regions(crops), selected_area)
+        job.region_images = crops
+        self.jobs[job.job_id] = job
+        self.mainView.show_screenshot_preview(job.job_id, job.image, job.selected_area)
+        
+        def regions_callback(results):
+            """Route the per-region results to the job (runs on the Tk thread)"""
+            self.on_job_result(job.job_id, format_region_results(results))
+        
+        print(f"[Controller] Starting OCR recognition of {len(crops)} regions as job #{job.job_id}")
+        job.expected_latency = self.ocrService.estimate_latency(crops)
+        job.future = self.ocrService.recognize_regions_async(
+            crops, self.dispatcher.wrap(regions_callback), self._job_deadline(crops)
+        )
+        self._show_eta(job)
+        return job
+    
+    def start_ocr_recognition(self, job):
+        """Start OCR recognition for a job's cropped image"""
         def ocr_callback(result):
-            """Callback function to handle OCR result"""
-            print(f"[Controller] OCR recognition completed")
-            # Update view with OCR result (execute in main thread)
-            if self.mainView.root:
-                self.mainView.root.after(0, lambda: self.mainView.update_ocr_result(result))
-        
-        # Start async OCR recognition
-        self.ocrService.recognize_async(image, ocr_callback)
+            """Route the OCR result to its job (runs on the Tk thread)"""
+            self.on_job_result(job.job_id, result)
+        
+        # Start async OCR recognition with a per-job deadline
+        job.expected_latency = self.ocrService.estimate_latency([job.image])
+        job.conversation = OCRConversation()
+        job.future = self.ocrService.recognize_async(
+            job.image, self.dispatcher.wrap(ocr_callback), self._job_deadline([job.image]), job.conversation
+        )
+    
+    def _job_deadline(self, images=None):
+        """Deadline for a job submitted now: ocr_budget if set, otherwise sized by the OCR service"""
+        return Deadline(self.ocr_budget or self.ocrService.job_budget(images))
+    
+    def on_job_result(self, job_id, result):
+        """OCR finished for a job - update its result tab"""
+        speculative = self.speculative_job
+        if speculative and speculative.job_id == job_id and speculative.is_pending:
+            # Not confirmed yet - keep the result until the job is adopted or discarded
+            speculative.complete(result)
+            print(f"[Controller] Speculative job #{job_id} finished before confirmation")
+            return
+        
+        job = self.jobs.get(job_id)
+        if job is None or not job.is_pending:
+            print(f"[Controller] Result for closed job #{job_id} dropped")
+            return
+        if job.refinements and is_error_result(result):
+            # Keep the previous result - the next refinement continues from it
+            job.refine_failed()
+            print(f"[Controller] Refinement {job.refinements} of job #{job_id} failed: {result}")
+            self._trace("refine_failed", job_id=job_id, refinement=job.refinements)
+            self.mainView.show_refine_failed(job_id, job.result, result)
+            return
+        job.complete(result)
+        if self.job_journal and job.journal_key and not is_error_result(result):
+            # A failed job stays pending in the journal and is retried on the next start
+            self.job_journal.complete(job.journal_key, result)
+        print(f"[Controller] OCR recognition completed for job #{job_id} in {job.latency():.2f}s "
+              f"({job.perceived_latency():.2f}s after confirmation)")
+        self._trace("job_result", job_id=job_id, latency=round(job.latency(), 4),
+                    perceived=round(job.perceived_latency(), 4), chars=len(result),
+                    refinement=job.refinements)
+        if not job.refinements and job.source in self.path_latency:
+            self.path_latency[job.source]['result'].append(job.perceived_latency())
+        if job.refinements:
+            self.mainView.update_ocr_result(
+                job_id, result, f"✅ Refinement {job.refinements} completed in {job.latency():.1f}s")
+        elif job.expected_latency is not None:
+            self.mainView.update_ocr_result(
+                job_id, result, f"✅ OCR recognition completed in {job.latency():.1f}s "
+                                f"(estimated {job.expected_latency:.1f}s)")
+        else:
+            self.mainView.update_ocr_result(job_id, result)
+    
+    def _show_eta(self, job):
+        """Show the time a running job is still expected to take in its tab"""
+        if job.expected_latency is None or not job.is_pending:
+            return
+        elapsed = time.monotonic() - job.submitted_at
+        self.mainView.set_job_eta(job.job_id, max(0.0, job.expected_latency - elapsed))
+    
+    def on_job_refine(self, job_id, instruction):
+        """Re-recognize a finished job following the user's instruction
+        
+        Continues the job's conversation with Ollama, so the image is not
+        uploaded and encoded again when the context is available.
+        """
+        instruction = instruction.strip()
+        job = self.jobs.get(job_id)
+        if not instruction or job is None:
+            return
+        if job.is_pending:
+            print(f"[Controller] Job #{job_id} is still running, refinement ignored")
+            return
+        if job.conversation is None:
+            job.conversation = OCRConversation()
+        if job.conversation.context is None and job.image is None:
+            print(f"[Controller] Job #{job_id} cannot be refined: no context and its image was released")
+            return
+        
+        def refine_callback(result):
+            """Route the refined result to its job (runs on the Tk thread)"""
+            self.on_job_result(job_id, result)
+        
+        job.refine()
+        self._trace("refine", job_id=job_id, instruction=instruction)
+        print(f"[Controller] Refining job #{job_id}: {instruction}")
+        self.mainView.show_refine_pending(job_id, instruction)
+        job.future = self.ocrService.refine_async(
+            instruction, job.result, job.conversation, self.dispatcher.wrap(refine_callback),
+            job.image, self._job_deadline([job.image] if job.image is not None else None)
+        )
+    
+    def release_job_image(self, job_id):
+        """Drop a job's full-size crop when the image budget is exceeded"""
+        if self.speculative_job and self.speculative_job.job_id == job_id:
+            self._discard_speculative_job()
+            return
+        job = self.jobs.get(job_id)
+        if job:
+            job.image = None
+        self.mainView.release_job_image(job_id)
+    
+    def on_job_closed(self, job_id):
+        """Result tab closed - cancel unfinished OCR and forget the job"""
+        job = self.jobs.pop(job_id, None)
+        self._trace("job_closed", job_id=job_id)
+        if job and (job.is_pending or (job.status == job.DONE and is_error_result(job.result))):
+            if job.is_pending:
+                print(f"[Controller] Cancelling OCR for closed job #{job_id}")
+                job.cancel()
+            # Unfinished or failed - the user gave up on it, so it is not resumed
+            if self.job_journal and job.journal_key:
+                self.job_journal.cancel(job.journal_key)
+        self.image_budget.release(f"job:{job_id}")
+    
+    def _journal_submit(self, job, kind, images):
+        """Record a confirmed job in the journal (with its result if it already has one)"""
+        if not self.job_journal:
+            return
+        job.journal_key = self.job_journal.submit(kind, job.selected_area, images)
+        if job.status == job.DONE and not is_error_result(job.result):
+            self.job_journal.complete(job.journal_key, job.result)
+    
+    def resume_journaled_jobs(self):
+        """Re-queue jobs a crash or kill left unfinished; finished ones are skipped"""
+        if not self.job_journal:
+            return
+        entries = self.job_journal.unfinished_jobs()
+        if not entries:
+            return
+        print(f"[Controller] Resuming {len(entries)} unfinished OCR job(s) from the journal")
+        for entry in entries:
+            if entry.kind == "regions":
+                job = self._start_regions_job(entry.images, entry.area)
+            else:
+                job = self._create_job(entry.images[0], entry.area)
+                self.jobs[job.job_id] = job
+                self.mainView.show_screenshot_preview(job.job_id, job.image, entry.area)
+                self.start_ocr_recognition(job)
+                self._show_eta(job)
+            job.journal_key = entry.key
+            job.source = "journal"
+            print(f"[Controller] Job #{job.job_id} resumed (attempt {entry.attempts})")
+    
+    def start_trace_recording(self):
+        """Start recording a session trace to the diagnostics folder"""
+        if self.trace_recorder:
+            print("[Controller] Session trace already recording")
+            return
+        self.trace_recorder = SessionRecorder({
+            "speculative_ocr": self.speculative_ocr,
+            "trim_margins": self.trim_margins,
+            "trim_pad": self.trim_pad,
+            "ocr_budget": self.ocr_budget,
+            "multi_region_policy": self.ocrService.multi_region_policy,
+            "model": self.ocrService.model_name,
+        })
+    
+    def stop_trace_recording(self):
+        """Stop recording; returns the trace folder"""
+        recorder = self.trace_recorder
+        if recorder is None:
+            return None
+        self.trace_recorder = None
+        return recorder.stop()
+    
+    def _trace(self, event, **fields):
+        """Add an event to the session trace, if one is recording"""
+        if self.trace_recorder:
+            self.trace_recorder.record(event, **fields)
+    
+    def _path_latency_summary(self):
+        """Median latency of the screen and clipboard input paths"""
+        def median(samples):
+            ordered = sorted(samples)
+            return ordered[len(ordered) // 2]
+        
+        parts = []
+        for path, ready_name, result_name in (("screen", "F1 to overlay", "Enter to result"),
+                                              ("clipboard", "hotkey to preview", "hotkey to result")):
+            stats = self.path_latency[path]
+            if not stats['ready']:
+                continue
+            text = f"{path}: {ready_name} {median(stats['ready']) * 1000:.0f}ms"
+            if stats['result']:
+                text += f", {result_name} {median(stats['result']):.2f}s"
+            parts.append(f"{text} (n={len(stats['result'])})")
+        return "; ".join(parts) or "No captures yet"
+    
+    def _job_summary(self):
+        """Counts of open jobs by status"""
+        pending = sum(1 for job in self.jobs.values() if job.is_pending)
+        return f"{pending} running, {len(self.jobs) - pending} done"
          
+    def start_watch_mode(self):
+        """Start a capture whose selection becomes a watched region"""
+        if self.region_watcher and self.region_watcher.is_running:
+            print("[Controller] Watch mode already active")
+            return
+        self.watch_requested = True
+        self.start_screenshot()
+    
+    def start_region_watch(self):
+        """Start watching the selected area and open the transcript window"""
+        region = self.selected_area
+        self.close_capture_window()
+        self.reset_controller_state()
+        
+        def on_text(text):
+            """Append changed content to the transcript (runs on the Tk thread)"""
+            self.mainView.append_watch_text(text)
+            if self.region_watcher:
+                self.mainView.set_watch_status(f"👁 {self.region_watcher.describe()}")
+        
+        self.mainView.show_watch_window(region, self.stop_watch_mode)
+        self.region_watcher = RegionWatcher(
+            region,
+            self.ocrService,
+            self.dispatcher.wrap(on_text),
+            interval=self.watch_interval,
+            change_threshold=self.watch_change_threshold
+        )
+        self.region_watcher.ocr_budget = self.ocr_budget
+        self.region_watcher.start()
+    
+    def stop_watch_mode(self):
+        """Stop region watch mode and close its window"""
+        if self.region_watcher:
+            self.region_watcher.stop()
+            self.region_watcher = None
+        self.mainView.close_watch_window()
+    
     def cancel_screenshot(self):
         """Cancel screenshot operation"""
         print("[Controller] Screenshot operation cancelled")
@@ -212,14 +819,29 @@ class MainController:
         self.start_x = None
         self.start_y = None
         self.selected_area = None
-        self.screenshot = None
+        self.pinned_areas = []
+        self._discard_speculative_job()
+        self.release_screenshot()
+        self.watch_requested = False
         
         print("[Controller] Controller state reset")
     
     def cleanup(self):
         """Cleanup resources"""
         print("[Controller] Cleaning up resources")
-        self.is_running = False
+        self.shutdown_event.set()
+        
+        # Stop region watch mode
+        if self.region_watcher:
+            self.region_watcher.stop()
+            self.region_watcher = None
+        
+        # Close a recording session trace
+        self.stop_trace_recording()
+        
+        # Save a running profiling session
+        if self.profiler.is_active:
+            self.profiler.stop()
         
         # Cleanup view
         if self.mainView:
@@ -231,9 +853,30 @@ class MainController:
         except:
             pass
         
+        # Stop the OCR event loop
+        self.ocrService.close()
+        
+        # Commit what is left in the journal
+        if self.job_journal:
+            self.job_journal.close()
+        
+        # Stop the tray loop so its (non-daemon) thread exits
+        if self.system_tray and self.system_tray.tray_icon:
+            try:
+                self.system_tray.tray_icon.stop()
+            except Exception as e:
+                print(f"[Controller] Error stopping tray icon: {e}")
+        
+        self.shutdown_complete.set()
+        
     def quit_threaded(self):
-        self.is_running = False
-        self.mainView.root.quit()
+        """Request shutdown from any thread; the Tk loop exits on its next command"""
+        self.shutdown_event.set()
+        self.dispatcher.post(self._quit_main_loop)
+    
+    def _quit_main_loop(self):
+        if self.mainView.root:
+            self.mainView.root.quit()
     
     def run(self):
         """Run OCR screenshot tool with system tray"""
@@ -247,20 +890,21 @@ class MainController:
         self.mainView.create_main_window()
         self.mainView.root.withdraw()  # Hide main window
         
-        # Start hotkey monitoring thread
-        hotkey_thread = threading.Thread(target=self._setup_hotkey, daemon=True)
-        hotkey_thread.start()
+        # Jobs left unfinished by a crash start again once the main loop runs
+        self.dispatcher.post(self.resume_journaled_jobs)
+        
+        # Register hotkeys (delivered by the keyboard library's listener thread)
+        self._setup_hotkey()
+        self._install_interrupt_wakeup()
         
         # Start system tray thread
         tray_thread = threading.Thread(target=self.system_tray.run_tray, daemon=False)
         tray_thread.start()
         
-        # Keep main thread running to handle Tkinter events
+        # Single Tk main loop: sleeps until an OS event or a queued command arrives
         try:
-            while self.is_running and self.system_tray.is_running:
-                if self.mainView.root:
-                    self.mainView.root.mainloop()
-                time.sleep(0.01)  # Reduce CPU usage
+            if self.is_running:
+                self.mainView.root.mainloop()
         except KeyboardInterrupt:
             print("\n[Controller] Program interrupted by user")
         except Exception as e:
@@ -1,8 +1,168 @@
 from typing import Callable, Dict
+import time
 import tkinter as tk
-from tkinter import messagebox, scrolledtext
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import messagebox, scrolledtext, ttk
 from PIL import ImageTk, Image
-import pyautogui
+
+# Largest thumbnail shown in the preview window
+PREVIEW_MAX_SIZE = (600, 500)
+
+# Closed result tabs kept for reuse
+MAX_FREE_PANELS = 4
+
+
+def fit_size(size, max_size):
+    """Display size that fits into max_size while keeping the aspect ratio"""
+    width, height = size
+    max_width, max_height = max_size
+    if width <= max_width and height <= max_height:
+        return width, height
+    ratio = min(max_width / width, max_height / height)
+    return max(1, int(width * ratio)), max(1, int(height * ratio))
+
+
+def make_thumbnail(image, max_size=PREVIEW_MAX_SIZE):
+    """Downscale a crop for display - safe to run off the Tk thread
+
+    reducing_gap makes Pillow first shrink by an integer factor with a cheap
+    box reduce() and only run LANCZOS on the already small image.
+    """
+    size = fit_size(image.size, max_size)
+    if size == image.size:
+        return image
+    return image.resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+
+# Text shown in a job panel until its OCR result arrives
+OCR_PENDING_TEXT = "OCR recognition is running...\nPlease wait for the results."
+
+
+class JobPanel:
+    """Result tab of one OCR job; widgets are recycled when the tab is closed"""
+
+    def __init__(self, notebook, view):
+        self.job_id = None
+        self.source = None  # Cropped PIL image, kept for saving
+        self.photo = None  # Thumbnail PhotoImage shown in the tab
+        self.placeholder = None
+        self.timings = {}
+        self.eta_due = None  # monotonic time the running job is expected to finish
+
+        self.frame = tk.Frame(notebook, bg='white')
+
+        # Info label at top
+        self.info_label = tk.Label(self.frame, text="", font=('Arial', 10), bg='white', fg='gray')
+        self.info_label.pack(fill=tk.X, pady=(5, 10))
+
+        # Create horizontal paned window for image and OCR results
+        paned_window = tk.PanedWindow(self.frame, orient=tk.HORIZONTAL, bg='white', sashrelief=tk.RAISED, sashwidth=5)
+        paned_window.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+
+        # Left panel - Image display
+        image_frame = tk.Frame(paned_window, bg='white', relief=tk.SUNKEN, bd=2)
+        image_title = tk.Label(image_frame, text="Screenshot Preview", font=('Arial', 12, 'bold'), bg='white')
+        image_title.pack(pady=(10, 5))
+        self.image_label = tk.Label(image_frame, bg='white', fg='gray', font=('Arial', 10))
+        self.image_label.pack(padx=10, pady=5)
+        paned_window.add(image_frame, minsize=300)
+
+        # Right panel - OCR results
+        ocr_frame = tk.Frame(paned_window, bg='white', relief=tk.SUNKEN, bd=2)
+        ocr_title = tk.Label(ocr_frame, text="OCR Recognition Results", font=('Arial', 12, 'bold'), bg='white')
+        ocr_title.pack(pady=(10, 5))
+        self.status_label = tk.Label(ocr_frame, text="", font=('Arial', 10), bg='white', fg='blue')
+        self.status_label.pack(pady=5)
+
+        ocr_text_frame = tk.Frame(ocr_frame, bg='white')
+        ocr_text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        self.text_widget = scrolledtext.ScrolledText(
+            ocr_text_frame,
+            wrap=tk.WORD,
+            width=40,
+            height=20,
+            font=('Arial', 10)
+        )
+        self.text_widget.pack(fill=tk.BOTH, expand=True)
+
+        # Follow-up instruction for the model ("re-read the second formula", "output as a table")
+        refine_frame = tk.Frame(ocr_frame, bg='white')
+        refine_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        self.refine_entry = tk.Entry(refine_frame, font=('Arial', 10))
+        self.refine_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
+        self.refine_entry.bind('<Return>', lambda event: view._refine_job(self))
+        refine_button = tk.Button(
+            refine_frame,
+            text="Refine",
+            command=lambda: view._refine_job(self),
+            bg='#FF9800',
+            fg='white',
+            font=('Arial', 10),
+            padx=10,
+            relief=tk.FLAT
+        )
+        refine_button.pack(side=tk.RIGHT)
+        paned_window.add(ocr_frame, minsize=400)
+
+        # Button frame at bottom
+        button_frame = tk.Frame(self.frame, bg='white')
+        button_frame.pack(fill=tk.X, pady=(10, 0))
+
+        save_button = tk.Button(
+            button_frame,
+            text="保存图片",
+            command=lambda: view._save_screenshot(self.source),
+            bg='#4CAF50',
+            fg='white',
+            font=('Arial', 10),
+            padx=20,
+            relief=tk.FLAT
+        )
+        save_button.pack(side=tk.LEFT, padx=(0, 10))
+
+        copy_button = tk.Button(
+            button_frame,
+            text="Copy OCR Result",
+            command=lambda: view._copy_ocr_result(self),
+            bg='#2196F3',
+            fg='white',
+            font=('Arial', 10),
+            padx=20,
+            relief=tk.FLAT
+        )
+        copy_button.pack(side=tk.LEFT, padx=(0, 10))
+
+        close_button = tk.Button(
+            button_frame,
+            text="关闭",
+            command=lambda: view.close_job_panel(self.job_id),
+            bg='#f44336',
+            fg='white',
+            font=('Arial', 10),
+            padx=20,
+            relief=tk.FLAT
+        )
+        close_button.pack(side=tk.RIGHT)
+
+    def set_text(self, text: str, editable: bool = True):
+        """Replace the OCR text area content"""
+        self.text_widget.config(state=tk.NORMAL)
+        self.text_widget.delete(1.0, tk.END)
+        self.text_widget.insert(tk.END, text)
+        self.text_widget.config(state=tk.NORMAL if editable else tk.DISABLED)
+
+    def clear(self):
+        """Drop images and text before the panel is recycled"""
+        self.image_label.config(image='', text="")
+        self.set_text("")
+        self.refine_entry.delete(0, tk.END)
+        self.job_id = None
+        self.source = None
+        self.photo = None
+        self.placeholder = None
+        self.timings = {}
+        self.eta_due = None
+
 
 class MainView:
     def __init__(self):
@@ -14,10 +174,19 @@ class MainView:
         self.result_text = None
         self.bg_image = None
         self.rect_id = None
+        self.pinned_rect_ids = []
         self.root = None
         self.preview_window = None
         self.capture_toplevel = None
-        self.ocr_text_widget = None  # Add OCR text widget reference
+        self.results_notebook = None
+        self.job_panels = {}  # job_id -> JobPanel of open result tabs
+        self._free_panels = []
+        self.preview_timings = {}
+        self._thumbnail_executor = None
+        self.dispatcher = None
+        self.watch_window = None
+        self.watch_text_widget = None
+        self.watch_status_label = None
 
     def setup_event_handlers(self, event_handlers: Dict[str, Callable]):
         """Public interface to setup event handlers"""
@@ -39,6 +208,11 @@ class MainView:
             'confirm': event_handlers.get('keyboard_confirm')
         }
         
+        self._window_handlers = {
+            'job_closed': event_handlers.get('job_closed'),
+            'job_refine': event_handlers.get('job_refine')
+        }
+        
         # Validate required handler functions
         required_handlers = ['mouse_down', 'mouse_drag', 'mouse_up', 'keyboard_cancel', 'keyboard_confirm']
         missing_handlers = [h for h in required_handlers if h not in event_handlers or event_handlers[h] is None]
@@ -112,7 +286,7 @@ class MainView:
         # Show instruction text
         self.canvas.create_text(
             screen_width//2, 50, 
-            text="拖拽鼠标框选需要OCR识别的区域，回车开始识别，ESC取消", 
+            text="拖拽鼠标框选需要OCR识别的区域（Shift+拖拽添加更多区域），回车开始识别，ESC取消", 
             fill='white', 
             font=('Arial', 16)
         )
@@ -181,6 +355,20 @@ class MainView:
             self.canvas.delete(self.rect_id)
             self.rect_id = None
     
+    def pin_current_rect(self):
+        """Keep the current selection rectangle while another one is drawn (Shift-drag)"""
+        if self.rect_id and self.canvas:
+            self.canvas.itemconfig(self.rect_id, outline='orange')
+            self.pinned_rect_ids.append(self.rect_id)
+            self.rect_id = None
+    
+    def clear_pinned_rects(self):
+        """Remove rectangles kept with Shift-drag"""
+        if self.canvas:
+            for rect_id in self.pinned_rect_ids:
+                self.canvas.delete(rect_id)
+        self.pinned_rect_ids = []
+    
     def draw_rect(self, start_x, start_y, end_x, end_y):
         """Draw selection rectangle"""
         if self.canvas:
@@ -217,209 +405,205 @@ class MainView:
             self.canvas.delete(self.info_text_id)
             self.info_text_id = None
             
-    def show_screenshot_preview(self, cropped_image, selected_area):
-        """Show screenshot preview in new window with OCR result area"""
-        print("[View] Creating screenshot preview window")
+    def set_dispatcher(self, dispatcher):
+        """Queue used to hand worker-thread results back to the Tk thread"""
+        self.dispatcher = dispatcher
+    
+    def _get_thumbnail_executor(self):
+        """Single worker for preview thumbnails, created on first use"""
+        if self._thumbnail_executor is None:
+            self._thumbnail_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Thumbnail")
+        return self._thumbnail_executor
+    
+    def show_screenshot_preview(self, job_id, cropped_image, selected_area):
+        """Open a result tab for an OCR job
+        
+        The results window is created once; every job gets its own tab, and
+        closed tabs are recycled. A placeholder of the final size appears
+        immediately; the thumbnail is computed on a worker thread and swapped
+        in when ready.
+        """
+        started = time.perf_counter()
+        print(f"[View] Showing preview for job #{job_id}")
         
         # Ensure main window exists
         self.create_main_window()
         
-        # If preview window already exists, close it first
-        if self.preview_window:
-            try:
-                self.preview_window.destroy()
-            except:
-                pass
-            self.preview_window = None
-        
-        # Create preview window as Toplevel
-        self.preview_window = tk.Toplevel(self.root)
-        self.preview_window.title("截图预览 - Screenshot Preview")
-        
-        # Calculate window size - make it larger to accommodate OCR results
+        # Calculate display size while maintaining aspect ratio (no pixels touched yet)
         img_width, img_height = cropped_image.size
+        display_width, display_height = fit_size(cropped_image.size, PREVIEW_MAX_SIZE)
         
-        # Set maximum image display size
-        max_img_width = 600
-        max_img_height = 500
-        
-        # Calculate display size while maintaining aspect ratio
-        if img_width > max_img_width or img_height > max_img_height:
-            ratio = min(max_img_width / img_width, max_img_height / img_height)
-            display_width = int(img_width * ratio)
-            display_height = int(img_height * ratio)
-            # Resize image for display
-            display_image = cropped_image.resize((display_width, display_height), Image.Resampling.LANCZOS)
-        else:
-            display_width = img_width
-            display_height = img_height
-            display_image = cropped_image
-        
-        # Set window size (wider to accommodate OCR results)
-        window_width = max(display_width + 500, 1000)  # Minimum width 1000, extra 500 for OCR
-        window_height = max(display_height, 1000)  # Minimum height 1000
-
-        # Center window on screen
-        screen_width = self.preview_window.winfo_screenwidth()
-        screen_height = self.preview_window.winfo_screenheight()
-        x = (screen_width - window_width) // 2
-        y = (screen_height - window_height) // 2
-        
-        self.preview_window.geometry(f"{window_width}x{window_height}+{x}+{y}")
-        self.preview_window.resizable(True, True)
+        if self.preview_window is None:
+            self._create_preview_window(display_width, display_height)
         
-        # Create main frame with horizontal layout
-        main_frame = tk.Frame(self.preview_window, bg='white')
-        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        panel = self._free_panels.pop() if self._free_panels else JobPanel(self.results_notebook, self)
+        panel.job_id = job_id
+        panel.source = cropped_image
+        self.job_panels[job_id] = panel
+        self.preview_timings = panel.timings
         
         # Info label at top
         left, top, right, bottom = selected_area
-        info_text = f"截图区域: {right-left}x{bottom-top} 像素 | 位置: ({left}, {top}) 到 ({right}, {bottom})"
-        info_label = tk.Label(
-            main_frame, 
-            text=info_text,
-            font=('Arial', 10),
-            bg='white',
-            fg='gray'
+        panel.info_label.config(
+            text=f"截图区域: {right-left}x{bottom-top} 像素 | 位置: ({left}, {top}) 到 ({right}, {bottom})"
         )
-        info_label.pack(fill=tk.X, pady=(0, 10))
         
-        # Create horizontal paned window for image and OCR results
-        paned_window = tk.PanedWindow(main_frame, orient=tk.HORIZONTAL, bg='white', sashrelief=tk.RAISED, sashwidth=5)
-        paned_window.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+        # Placeholder reserves the thumbnail's space until it is ready
+        panel.placeholder = tk.PhotoImage(width=display_width, height=display_height)
+        panel.image_label.config(image=panel.placeholder, text="⏳ Loading preview...", compound=tk.CENTER)
+        panel.status_label.config(text="🔄 OCR recognition in progress...", fg='blue')
+        panel.set_text(OCR_PENDING_TEXT, editable=False)
         
-        # Left panel - Image display
-        image_frame = tk.Frame(paned_window, bg='white', relief=tk.SUNKEN, bd=2)
-        
-        # Image title
-        image_title = tk.Label(image_frame, text="Screenshot Preview", font=('Arial', 12, 'bold'), bg='white')
-        image_title.pack(pady=(10, 5))
-        
-        # Convert PIL image to PhotoImage and display
-        self.preview_image = ImageTk.PhotoImage(display_image)
-        image_label = tk.Label(image_frame, image=self.preview_image, bg='white')
-        image_label.pack(padx=10, pady=5)
-        
-        paned_window.add(image_frame, minsize=300)
+        self.results_notebook.add(panel.frame, text=f"#{job_id} ⏳")
+        self.results_notebook.select(panel.frame)
         
-        # Right panel - OCR results
-        ocr_frame = tk.Frame(paned_window, bg='white', relief=tk.SUNKEN, bd=2)
-        
-        # OCR title
-        ocr_title = tk.Label(ocr_frame, text="OCR Recognition Results", font=('Arial', 12, 'bold'), bg='white')
-        ocr_title.pack(pady=(10, 5))
+        # Show window
+        self.preview_window.deiconify()
+        self.preview_window.lift()
+        self.preview_window.focus_set()
+        panel.timings['placeholder'] = time.perf_counter() - started
         
-        # OCR status label
-        self.ocr_status_label = tk.Label(
-            ocr_frame, 
-            text="🔄 OCR recognition in progress...",
-            font=('Arial', 10),
-            bg='white',
-            fg='blue'
-        )
-        self.ocr_status_label.pack(pady=5)
+        # Downscale off the Tk thread
+        if self.dispatcher is None:
+            self._apply_thumbnail(job_id, started, make_thumbnail(cropped_image, PREVIEW_MAX_SIZE))
+        else:
+            future = self._get_thumbnail_executor().submit(make_thumbnail, cropped_image, PREVIEW_MAX_SIZE)
+            future.add_done_callback(
+                lambda f: self.dispatcher.post(self._on_thumbnail_done, job_id, started, f)
+            )
         
-        # OCR results text area
-        ocr_text_frame = tk.Frame(ocr_frame, bg='white')
-        ocr_text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        print(f"[View] Preview for job #{job_id} shown: {img_width}x{img_height} pixels")
+    
+    def _on_thumbnail_done(self, job_id, started, future):
+        """Thumbnail worker finished (Tk thread)"""
+        try:
+            thumbnail = future.result()
+        except Exception as e:
+            print(f"[View] Thumbnail generation failed: {e}")
+            return
+        self._apply_thumbnail(job_id, started, thumbnail)
+    
+    def _apply_thumbnail(self, job_id, started, thumbnail):
+        """Swap the placeholder for the finished thumbnail"""
+        panel = self.job_panels.get(job_id)
+        if panel is None:
+            print(f"[View] Discarding thumbnail for closed job #{job_id}")
+            return
+        panel.photo = ImageTk.PhotoImage(thumbnail)
+        panel.image_label.config(image=panel.photo, text="")
+        panel.placeholder = None
+        panel.timings['image'] = time.perf_counter() - started
+    
+    def _create_preview_window(self, display_width, display_height):
+        """Build the results window (once)"""
+        print("[View] Creating screenshot preview window")
         
-        self.ocr_text_widget = scrolledtext.ScrolledText(
-            ocr_text_frame,
-            wrap=tk.WORD,
-            width=40,
-            height=20,
-            font=('Arial', 10)
-        )
-        self.ocr_text_widget.pack(fill=tk.BOTH, expand=True)
+        # Create preview window as Toplevel
+        self.preview_window = tk.Toplevel(self.root)
+        self.preview_window.title("截图预览 - Screenshot Preview")
+        self.preview_window.resizable(True, True)
         
-        # Initially show loading message
-        self.ocr_text_widget.insert(tk.END, "OCR recognition is running...\nPlease wait for the results.")
-        self.ocr_text_widget.config(state=tk.DISABLED)
+        # Set window size (wider to accommodate OCR results)
+        window_width = max(display_width + 500, 1000)  # Minimum width 1000, extra 500 for OCR
+        window_height = max(display_height + 150, 1000)  # Minimum height 1000
+
+        # Center window on screen
+        screen_width = self.preview_window.winfo_screenwidth()
+        screen_height = self.preview_window.winfo_screenheight()
+        x = (screen_width - window_width) // 2
+        y = (screen_height - window_height) // 2
+        self.preview_window.geometry(f"{window_width}x{window_height}+{x}+{y}")
         
-        paned_window.add(ocr_frame, minsize=400)
+        # One tab per OCR job
+        self.results_notebook = ttk.Notebook(self.preview_window)
+        self.results_notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        # Button frame at bottom
-        button_frame = tk.Frame(main_frame, bg='white')
-        button_frame.pack(fill=tk.X, pady=(10, 0))
+        # Closing the window closes every job tab
+        self.preview_window.protocol("WM_DELETE_WINDOW", self.close_preview_window)
         
-        # Save Image button
-        save_button = tk.Button(
-            button_frame,
-            text="保存图片",
-            command=lambda: self._save_screenshot(cropped_image),
-            bg='#4CAF50',
-            fg='white',
-            font=('Arial', 10),
-            padx=20,
-            relief=tk.FLAT
-        )
-        save_button.pack(side=tk.LEFT, padx=(0, 10))
+        # Set window properties
+        self.preview_window.attributes('-topmost', True)
+    
+    def update_ocr_result(self, job_id, result: str, status: str = "✅ OCR recognition completed"):
+        """Update OCR result in the job's tab"""
+        panel = self.job_panels.get(job_id)
+        if panel is None:
+            print(f"[View] Result for closed job #{job_id} ignored")
+            return
         
-        # Copy OCR Result button
-        copy_button = tk.Button(
-            button_frame,
-            text="Copy OCR Result",
-            command=self._copy_ocr_result,
-            bg='#2196F3',
-            fg='white',
-            font=('Arial', 10),
-            padx=20,
-            relief=tk.FLAT
-        )
-        copy_button.pack(side=tk.LEFT, padx=(0, 10))
+        print(f"[View] Updating OCR result for job #{job_id}")
         
-        # Close button
-        close_button = tk.Button(
-            button_frame,
-            text="关闭",
-            command=self._close_preview_window,
-            bg='#f44336',
-            fg='white',
-            font=('Arial', 10),
-            padx=20,
-            relief=tk.FLAT
+        # Update status label
+        panel.eta_due = None
+        panel.status_label.config(
+            text=status,
+            fg='green'
         )
-        close_button.pack(side=tk.RIGHT)
         
-        # Bind window close event
-        self.preview_window.protocol("WM_DELETE_WINDOW", self._close_preview_window)
+        # Update text widget (keep editable for copying)
+        panel.set_text(result)
+        self.results_notebook.tab(panel.frame, text=f"#{job_id} ✅")
         
-        # Set window properties
-        self.preview_window.attributes('-topmost', True)
-        self.preview_window.focus_set()
-        
-        # 强制更新布局
-        self.preview_window.update_idletasks()
-        
-        print(f"[View] Screenshot preview window created: {img_width}x{img_height} pixels")
-    
-    def update_ocr_result(self, result: str):
-        """Update OCR result in the preview window"""
-        if self.preview_window and self.ocr_text_widget:
-            print("[View] Updating OCR result")
-            
-            # Update status label
-            self.ocr_status_label.config(
-                text="✅ OCR recognition completed",
-                fg='green'
-            )
-            
-            # Update text widget
-            self.ocr_text_widget.config(state=tk.NORMAL)
-            self.ocr_text_widget.delete(1.0, tk.END)
-            self.ocr_text_widget.insert(tk.END, result)
-            self.ocr_text_widget.config(state=tk.NORMAL)  # Keep editable for copying
-            
-            print("[View] OCR result updated successfully")
+        print(f"[View] OCR result for job #{job_id} updated successfully")
+
+    def show_refine_pending(self, job_id, instruction: str):
+        """Mark a job's tab as refining; the previous result stays visible until the new one arrives"""
+        panel = self.job_panels.get(job_id)
+        if panel is None:
+            return
+        panel.eta_due = None
+        panel.status_label.config(text=f"🔄 Refining: {instruction}", fg='blue')
+        panel.refine_entry.delete(0, tk.END)
+        self.results_notebook.tab(panel.frame, text=f"#{job_id} ⏳")
+
+    def show_refine_failed(self, job_id, result: str, error: str):
+        """A refinement failed - the previous result stays, the error goes to the status line"""
+        panel = self.job_panels.get(job_id)
+        if panel is None:
+            return
+        panel.eta_due = None
+        panel.status_label.config(text=f"❌ {error}", fg='red')
+        self.results_notebook.tab(panel.frame, text=f"#{job_id} ✅")
+
+    def set_job_eta(self, job_id, seconds: float):
+        """Show the expected time left for a running job, counting down once per second"""
+        panel = self.job_panels.get(job_id)
+        if panel is None:
+            return
+        panel.eta_due = time.monotonic() + seconds
+        self._tick_job_eta(panel, job_id)
+
+    def _tick_job_eta(self, panel, job_id):
+        if panel.job_id != job_id or panel.eta_due is None or not self.root:
+            return
+        left = panel.eta_due - time.monotonic()
+        if left > 0:
+            text = f"🔄 OCR recognition in progress... about {max(1, round(left))}s left"
+            self.root.after(1000, self._tick_job_eta, panel, job_id)
         else:
-            print("[View] Warning: Preview window or OCR text widget not available")
+            text = "🔄 OCR recognition in progress... taking longer than expected"
+        panel.status_label.config(text=text, fg='blue')
 
-    def _copy_ocr_result(self):
+    def _refine_job(self, panel):
+        """Send the panel's follow-up instruction to the controller"""
+        instruction = panel.refine_entry.get().strip()
+        handler = self._window_handlers.get('job_refine')
+        if panel.job_id is None or not instruction or handler is None:
+            return
+        handler(panel.job_id, instruction)
+
+    def release_job_image(self, job_id):
+        """Drop the full-size crop of a job (image budget exceeded); the thumbnail stays"""
+        panel = self.job_panels.get(job_id)
+        if panel:
+            panel.source = None
+
+    def _copy_ocr_result(self, panel):
         """Copy OCR result to clipboard"""
-        if self.ocr_text_widget:
+        if panel.job_id is not None:
             try:
-                content = self.ocr_text_widget.get(1.0, tk.END).strip()
-                if content and content != "OCR recognition is running...\nPlease wait for the results.":
+                content = panel.text_widget.get(1.0, tk.END).strip()
+                if content and content != OCR_PENDING_TEXT:
                     self.preview_window.clipboard_clear()
                     self.preview_window.clipboard_append(content)
                     
@@ -435,21 +619,57 @@ class MainView:
         else:
             messagebox.showwarning("Copy Failed", "OCR result not available")
 
-    def _close_preview_window(self):
-        """Safely close preview window"""
+    def close_job_panel(self, job_id):
+        """Close one job's tab and recycle its widgets"""
+        panel = self.job_panels.pop(job_id, None)
+        if panel is None:
+            return
+        print(f"[View] Closing result tab for job #{job_id}")
+        try:
+            self.results_notebook.forget(panel.frame)
+            panel.clear()
+            if len(self._free_panels) < MAX_FREE_PANELS:
+                self._free_panels.append(panel)
+            else:
+                panel.frame.destroy()
+        except Exception as e:
+            print(f"[View] Error closing result tab: {e}")
+        finally:
+            if self._window_handlers.get('job_closed'):
+                self._window_handlers['job_closed'](job_id)
+        
+        # Hide the window once the last tab is gone
+        if not self.job_panels and self.preview_window:
+            self.preview_window.withdraw()
+
+    def close_preview_window(self):
+        """Close every job tab and hide the results window (the window is reused)"""
+        for job_id in list(self.job_panels):
+            self.close_job_panel(job_id)
+        if self.preview_window:
+            self.preview_window.withdraw()
+    
+    def _destroy_preview_window(self):
+        """Destroy the results window (program exit)"""
+        self.close_preview_window()
         if self.preview_window:
             try:
-                print("[View] Closing preview window")
                 self.preview_window.destroy()
             except Exception as e:
-                print(f"[View] Error closing preview window: {e}")
+                print(f"[View] Error destroying preview window: {e}")
             finally:
                 self.preview_window = None
-                self.preview_image = None
-                self.ocr_text_widget = None
+                self.results_notebook = None
+                self._free_panels = []
+        if self._thumbnail_executor:
+            self._thumbnail_executor.shutdown(wait=False)
+            self._thumbnail_executor = None
             
     def _save_screenshot(self, image):
         """Save screenshot to file"""
+        if image is None:
+            messagebox.showwarning("保存失败", "截图已释放，无法保存")
+            return
         try:
             from tkinter import filedialog
             from datetime import datetime
@@ -482,6 +702,90 @@ class MainView:
             messagebox.showerror("保存失败", error_msg)
             print(f"[View] Save error: {e}")
             
+    def show_watch_window(self, selected_area, on_stop: Callable):
+        """Show running transcript window for region watch mode"""
+        print("[View] Creating watch transcript window")
+        self.create_main_window()
+        self.close_watch_window()
+        
+        self.watch_window = tk.Toplevel(self.root)
+        self.watch_window.title("区域监视 - Region Watch")
+        self.watch_window.geometry("600x500")
+        
+        main_frame = tk.Frame(self.watch_window, bg='white')
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        left, top, right, bottom = selected_area
+        info_label = tk.Label(
+            main_frame,
+            text=f"监视区域: {right-left}x{bottom-top} 像素 | 位置: ({left}, {top})",
+            font=('Arial', 10),
+            bg='white',
+            fg='gray'
+        )
+        info_label.pack(fill=tk.X, pady=(0, 5))
+        
+        self.watch_status_label = tk.Label(
+            main_frame,
+            text="👁 Watching for changes...",
+            font=('Arial', 10),
+            bg='white',
+            fg='blue'
+        )
+        self.watch_status_label.pack(fill=tk.X, pady=(0, 5))
+        
+        self.watch_text_widget = scrolledtext.ScrolledText(
+            main_frame,
+            wrap=tk.WORD,
+            font=('Arial', 10)
+        )
+        self.watch_text_widget.pack(fill=tk.BOTH, expand=True)
+        
+        button_frame = tk.Frame(main_frame, bg='white')
+        button_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        stop_button = tk.Button(
+            button_frame,
+            text="停止监视",
+            command=on_stop,
+            bg='#f44336',
+            fg='white',
+            font=('Arial', 10),
+            padx=20,
+            relief=tk.FLAT
+        )
+        stop_button.pack(side=tk.RIGHT)
+        
+        self.watch_window.protocol("WM_DELETE_WINDOW", on_stop)
+        self.watch_window.attributes('-topmost', True)
+    
+    def append_watch_text(self, text: str):
+        """Append a new OCR result to the watch transcript"""
+        if not self.watch_text_widget:
+            return
+        from datetime import datetime
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        self.watch_text_widget.insert(tk.END, f"[{timestamp}]\n{text}\n\n")
+        self.watch_text_widget.see(tk.END)
+    
+    def set_watch_status(self, text: str):
+        """Update watch mode status line"""
+        if self.watch_status_label:
+            self.watch_status_label.config(text=text)
+    
+    def close_watch_window(self):
+        """Close watch transcript window"""
+        if self.watch_window:
+            print("[View] Closing watch window")
+            try:
+                self.watch_window.destroy()
+            except Exception as e:
+                print(f"[View] Error closing watch window: {e}")
+            finally:
+                self.watch_window = None
+                self.watch_text_widget = None
+                self.watch_status_label = None
+    
     def close_capture_window(self):
         """Close capture window only"""
         if self.capture_toplevel:
@@ -495,17 +799,21 @@ class MainView:
                 self.canvas = None
                 self.bg_image = None
                 self.rect_id = None
+                self.pinned_rect_ids = []
 
     def close_all_windows(self):
         """Close all windows for program exit"""
         print("[View] Closing all windows")
         
         # Close preview window
-        self._close_preview_window()
+        self._destroy_preview_window()
         
         # Close capture window
         self.close_capture_window()
         
+        # Close watch window
+        self.close_watch_window()
+        
         # Close main window
         if self.root:
             try:
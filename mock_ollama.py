@@ -0,0 +1,189 @@
+import asyncio
+import base64
+import json
+import re
+import time
+from io import BytesIO
+from typing import Optional
+from aiohttp import web
+from PIL import Image
+from async_core import AsyncCore
+from ocr_service import REGION_MARKER
+
+
+class MockOllamaServer:
+    """Local stand-in for the Ollama HTTP API, used by benchmarks and headless runs
+
+    Serves /api/generate with a fixed response after a configurable delay,
+    so the whole client stack (encoding, HTTP, retries) is exercised without
+    a GPU or a model. Each request costs latency plus per_image_latency for
+    every attached image, plus per_megapixel_latency per megapixel of image
+    (like a vision encoder whose cost grows with the image); multi-image
+    requests get one marked section per image, as the multi-region prompt
+    asks for.
+
+    Streaming requests get NDJSON chunks, one word per token_latency. With
+    runaway_repeats set, the answer falls into a repetition loop of
+    runaway_line unless the request raises repeat_penalty above 1.1 (like
+    a model that only loops with default sampling). Generation stops at
+    the request's num_predict with done_reason "length", like Ollama.
+
+    Final replies carry a context; a follow-up that sends it back without
+    images pays only latency, like a backend whose KV cache still holds the
+    image, and its answer is marked "(refined)". They also carry Ollama's
+    counters: prompt_eval_count (prompt words plus tokens_per_megapixel per
+    image megapixel), eval_count and the durations actually spent; the first
+    request adds load_latency as a model load. /api/version reports version.
+    """
+
+    def __init__(self, latency: float = 0.05, response_text: str = "Mock OCR result: $ E = mc^2 $",
+                 port: int = 0, per_image_latency: float = 0.0, token_latency: float = 0.0,
+                 runaway_repeats: int = 0, runaway_line: str = "$$ x^2 + y^2 = z^2 $$",
+                 per_megapixel_latency: float = 0.0, tokens_per_megapixel: int = 1200,
+                 load_latency: float = 0.0, version: str = "0.0.0-mock"):
+        self.latency = latency
+        self.tokens_per_megapixel = tokens_per_megapixel
+        self.load_latency = load_latency
+        self.version = version
+        self.model_loaded = False
+        self.per_image_latency = per_image_latency
+        self.per_megapixel_latency = per_megapixel_latency
+        self.token_latency = token_latency
+        self.response_text = response_text
+        self.runaway_repeats = runaway_repeats
+        self.runaway_line = runaway_line
+        self.port = port
+        self.request_count = 0
+        self.image_count = 0
+        self.tokens_sent = 0
+        self.aborted_count = 0
+        self.core = AsyncCore(name="MockOllamaLoop", executor_workers=1)
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def url(self) -> str:
+        """Generate endpoint of the running server"""
+        return f"http://127.0.0.1:{self.port}/api/generate"
+
+    async def _handle_generate(self, request: web.Request) -> web.Response:
+        started = time.monotonic()
+        payload = await request.json()
+        images = payload.get("images") or []
+        self.request_count += 1
+        self.image_count += len(images)
+        load_duration = 0.001
+        if not self.model_loaded:
+            self.model_loaded = True
+            load_duration += self.load_latency
+            await asyncio.sleep(self.load_latency)
+        prompt_started = time.monotonic()
+        pixels = sum(_image_pixels(image) for image in images) if images else 0
+        delay = self.latency + self.per_image_latency * len(images) + self.per_megapixel_latency * pixels / 1e6
+        await asyncio.sleep(delay)
+        counters = {
+            "load_duration": int(load_duration * 1e9),
+            "prompt_eval_count": len(payload.get("prompt", "").split()) + int(pixels / 1e6 * self.tokens_per_megapixel),
+            "prompt_eval_duration": int((time.monotonic() - prompt_started) * 1e9),
+        }
+
+        text = self.response_text
+        if payload.get("context"):
+            text += " (refined)"
+        if len(images) > 1:
+            text = "\n".join(f"{REGION_MARKER.format(index=index)}\n{self.response_text} ({index})"
+                             for index in range(1, len(images) + 1))
+        options = payload.get("options") or {}
+        if self.runaway_repeats and options.get("repeat_penalty", 1.1) <= 1.1:
+            text += ("\n\n" + self.runaway_line) * self.runaway_repeats
+        tokens = re.findall(r"\s*\S+", text)
+        # Like Ollama, stop at num_predict and say why the generation ended
+        limit = options.get("num_predict")
+        done_reason = "stop"
+        if limit is not None and 0 <= limit < len(tokens):
+            tokens, done_reason = tokens[:limit], "length"
+            text = "".join(tokens)
+        # Stand-in token IDs: the previous context, then one per prompt word and response token
+        context = (payload.get("context") or []) + list(range(len(payload.get("prompt", "").split())
+                                                               + len(tokens)))
+
+        def final_counters(eval_started):
+            now = time.monotonic()
+            return {**counters, "eval_count": len(tokens), "eval_duration": int((now - eval_started) * 1e9),
+                    "total_duration": int((now - started) * 1e9), "done_reason": done_reason}
+
+        if not payload.get("stream", True):
+            eval_started = time.monotonic()
+            await asyncio.sleep(self.token_latency * len(tokens))
+            self.tokens_sent += len(tokens)
+            return web.json_response({"model": "mock", "response": text, "done": True, "context": context,
+                                      **final_counters(eval_started)})
+
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        try:
+            await response.prepare(request)
+            eval_started = time.monotonic()
+            for token in tokens:
+                if self.token_latency:
+                    await asyncio.sleep(self.token_latency)
+                await response.write(self._chunk(token, False))
+                self.tokens_sent += 1
+            await response.write(self._chunk("", True, context, final_counters(eval_started)))
+            await response.write_eof()
+        except ConnectionResetError:
+            # Client stopped reading (generation guard) - stop "generating"
+            self.aborted_count += 1
+        return response
+
+    @staticmethod
+    def _chunk(token: str, done: bool, context=None, counters=None) -> bytes:
+        chunk = {"model": "mock", "response": token, "done": done}
+        if context is not None:
+            chunk["context"] = context
+        chunk.update(counters or {})
+        return (json.dumps(chunk) + "\n").encode()
+
+    async def _handle_tags(self, request: web.Request) -> web.Response:
+        return web.json_response({"models": [{"name": "mock", "digest": f"mock-{self.version}"}]})
+
+    async def _handle_version(self, request: web.Request) -> web.Response:
+        return web.json_response({"version": self.version})
+
+    async def _start(self):
+        app = web.Application(client_max_size=256 * 1024 * 1024)
+        app.router.add_post("/api/generate", self._handle_generate)
+        app.router.add_get("/api/tags", self._handle_tags)
+        app.router.add_get("/api/version", self._handle_version)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def _stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def start(self) -> str:
+        """Start serving on a background loop; returns the generate URL"""
+        self.core.run(self._start())
+        print(f"[Mock] Mock Ollama server listening on {self.url}")
+        return self.url
+
+    def stop(self):
+        """Shut the server down"""
+        self.core.run(self._stop())
+        self.core.stop()
+        print("[Mock] Mock Ollama server stopped")
+
+
+def _image_pixels(image_base64: str) -> int:
+    """Pixel count of a base64 PNG (reads the header only), 0 for anything that is not an image
+
+    Warm-up requests post an empty image; they must still get a normal reply.
+    """
+    try:
+        with Image.open(BytesIO(base64.b64decode(image_base64))) as image:
+            return image.width * image.height
+    except (OSError, ValueError):
+        return 0
@@ -0,0 +1,238 @@
+import json
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+# Counters of a final /api/generate reply; durations are in nanoseconds
+DURATION_FIELDS = ("total_duration", "load_duration", "prompt_eval_duration", "eval_duration")
+COUNT_FIELDS = ("prompt_eval_count", "eval_count")
+
+
+def parse_reply_stats(reply: Optional[Dict]) -> Optional[Dict[str, float]]:
+    """Ollama's token counts and timings from a final reply, durations in seconds
+
+    None if the reply has none (stopped generations, other backends).
+    """
+    if not reply or "eval_count" not in reply:
+        return None
+    stats = {field: reply[field] for field in COUNT_FIELDS if field in reply}
+    for field in DURATION_FIELDS:
+        if field in reply:
+            stats[field] = reply[field] / 1e9
+    return stats
+
+
+class ModelStats:
+    """Model-side token counts and timings per request, next to the client-side latency
+
+    Aggregates the recent window into generation and prompt tokens per
+    second, vision tokens per megapixel (slope of prompt tokens against
+    image size) and how often the model had to be loaded.
+
+    Every min_samples requests the generation and prompt token rates of an
+    endpoint/model pair are compared with its baseline; a drop of more than
+    regression_threshold raises an alert (once per session), naming the
+    Ollama version and model digest if they changed since the baseline was
+    taken. Otherwise the baseline follows the new rates slowly. Baselines
+    are saved to baseline_path and each request is appended to log_path
+    (JSON lines); None keeps them in memory.
+    """
+
+    def __init__(self, baseline_path: Optional[str] = None, log_path: Optional[str] = None,
+                 window: int = 200, min_samples: int = 10, regression_threshold: float = 0.2,
+                 load_threshold: float = 0.5):
+        self.baseline_path = baseline_path
+        self.log_path = log_path
+        self.min_samples = min_samples
+        self.regression_threshold = regression_threshold
+        self.load_threshold = load_threshold  # load_duration above this means the model was (re)loaded
+        self.samples = deque(maxlen=window)
+        self.requests = 0
+        self.model_loads = 0
+        self.versions: Dict[str, Optional[str]] = {}  # endpoint -> "Ollama <version>, model <digest>"
+        self.alerts: List[str] = []
+        self.baselines: Dict[str, Dict] = {}
+        self._unchecked: Dict[str, int] = {}
+        self._alerted = set()
+        self._listeners: List[Callable[[str], None]] = []
+        self._lock = threading.Lock()
+        self._load()
+
+    def add_listener(self, listener: Callable[[str], None]):
+        """Register a function called with the message of each regression alert"""
+        self._listeners.append(listener)
+
+    def record(self, endpoint: str, model: str, reply: Optional[Dict], client_latency: float,
+               image_pixels: Optional[int] = None, images: int = 0) -> Optional[Dict]:
+        """Add the counters of one completed request; returns the stored sample"""
+        stats = parse_reply_stats(reply)
+        if stats is None:
+            return None
+        sample = {
+            "time": datetime.now().isoformat(timespec='seconds'),
+            "endpoint": endpoint,
+            "model": model,
+            "version": self.versions.get(endpoint),
+            "images": images,
+            "image_pixels": image_pixels,
+            "client_latency": round(client_latency, 4),
+            **stats,
+        }
+        if stats.get("eval_duration"):
+            sample["tokens_per_second"] = stats.get("eval_count", 0) / stats["eval_duration"]
+        if stats.get("prompt_eval_duration") and stats.get("prompt_eval_count"):
+            sample["prompt_tokens_per_second"] = stats["prompt_eval_count"] / stats["prompt_eval_duration"]
+        if "total_duration" in stats:
+            # HTTP, queueing in Ollama and JSON handling around the model's own work
+            sample["client_overhead"] = client_latency - stats["total_duration"]
+
+        key = f"{model} @ {endpoint}"
+        with self._lock:
+            self.samples.append(sample)
+            self.requests += 1
+            if stats.get("load_duration", 0.0) > self.load_threshold:
+                self.model_loads += 1
+            self._unchecked[key] = self._unchecked.get(key, 0) + 1
+            check = self._unchecked[key] >= self.min_samples
+            if check:
+                self._unchecked[key] = 0
+        self._write_log(sample)
+        if check:
+            self._check_regression(key, endpoint, model)
+        return sample
+
+    def _rates(self, endpoint: str, model: str) -> Dict[str, float]:
+        """Median token rates of the pair's most recent min_samples requests"""
+        with self._lock:
+            recent = [sample for sample in self.samples
+                      if sample["endpoint"] == endpoint and sample["model"] == model][-self.min_samples:]
+        rates = {}
+        for name in ("tokens_per_second", "prompt_tokens_per_second"):
+            values = [sample[name] for sample in recent if name in sample]
+            if values:
+                rates[name] = statistics.median(values)
+        return rates
+
+    def _check_regression(self, key: str, endpoint: str, model: str):
+        rates = self._rates(endpoint, model)
+        version = self.versions.get(endpoint)
+        baseline = self.baselines.get(key)
+        if baseline is None:
+            self.baselines[key] = {**rates, "version": version}
+            self._save()
+            return
+
+        drops = []
+        for name, label in (("tokens_per_second", "generation"), ("prompt_tokens_per_second", "prompt")):
+            before, now = baseline.get(name), rates.get(name)
+            if before and now is not None and now < before * (1 - self.regression_threshold):
+                drops.append(f"{label} {now:.0f} tok/s, {1 - now / before:.0%} below {before:.0f}")
+        if drops:
+            if key not in self._alerted:
+                self._alerted.add(key)
+                changed = (f" after upgrade from {baseline.get('version')} to {version}"
+                           if version and baseline.get("version") and version != baseline["version"] else "")
+                self._alert(f"{model} throughput regressed{changed}: {'; '.join(drops)}")
+            return
+
+        # No regression: a new version becomes the baseline, otherwise it drifts slowly
+        fresh = version != baseline.get("version")
+        for name, now in rates.items():
+            before = baseline.get(name)
+            baseline[name] = now if fresh or before is None else 0.8 * before + 0.2 * now
+        baseline["version"] = version
+        self._save()
+
+    def _alert(self, message: str):
+        self.alerts.append(message)
+        print(f"[Stats] ALERT: {message}")
+        for listener in list(self._listeners):
+            try:
+                listener(message)
+            except Exception as e:
+                print(f"[Stats] Listener error: {e}")
+
+    def vision_tokens_per_megapixel(self) -> Optional[float]:
+        """Prompt tokens per image megapixel: the slope over requests of different sizes"""
+        with self._lock:
+            points = [(sample["image_pixels"] / 1e6, sample["prompt_eval_count"]) for sample in self.samples
+                      if sample.get("image_pixels") and sample.get("prompt_eval_count")]
+        if not points:
+            return None
+        megapixels = np.array([point[0] for point in points])
+        tokens = np.array([point[1] for point in points], dtype=float)
+        if np.ptp(megapixels) < 0.05:
+            # All about the same size - the text prompt is included
+            return float(np.median(tokens / megapixels))
+        return float(np.polyfit(megapixels, tokens, 1)[0])
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """Aggregates of the recent window"""
+        with self._lock:
+            samples = list(self.samples)
+
+        def median(name):
+            values = [sample[name] for sample in samples if name in sample]
+            return statistics.median(values) if values else None
+
+        return {
+            "requests": self.requests,
+            "tokens_per_second": median("tokens_per_second"),
+            "prompt_tokens_per_second": median("prompt_tokens_per_second"),
+            "vision_tokens_per_megapixel": self.vision_tokens_per_megapixel(),
+            "model_load_rate": self.model_loads / self.requests if self.requests else None,
+            "client_overhead": median("client_overhead"),
+        }
+
+    def describe(self) -> str:
+        """Summary line for status output"""
+        if not self.requests:
+            return "No model statistics yet"
+        summary = self.summary()
+        parts = [f"{self.requests} requests"]
+        if summary["tokens_per_second"] is not None:
+            parts.append(f"generation {summary['tokens_per_second']:.1f} tok/s")
+        if summary["prompt_tokens_per_second"] is not None:
+            parts.append(f"prompt {summary['prompt_tokens_per_second']:.0f} tok/s")
+        if summary["vision_tokens_per_megapixel"] is not None:
+            parts.append(f"~{summary['vision_tokens_per_megapixel']:.0f} vision tokens/MP")
+        parts.append(f"model loaded in {self.model_loads}/{self.requests} requests")
+        if summary["client_overhead"] is not None:
+            parts.append(f"client overhead {summary['client_overhead'] * 1000:.0f}ms")
+        if self.alerts:
+            parts.append(f"{len(self.alerts)} regression alert(s)")
+        return ", ".join(parts)
+
+    def _write_log(self, sample: Dict):
+        if not self.log_path:
+            return
+        try:
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(sample) + "\n")
+        except OSError as e:
+            print(f"[Stats] Could not write model statistics: {e}")
+
+    def _load(self):
+        if not self.baseline_path or not os.path.exists(self.baseline_path):
+            return
+        try:
+            with open(self.baseline_path, encoding='utf-8') as f:
+                self.baselines = json.load(f).get("baselines", {})
+        except (OSError, ValueError) as e:
+            print(f"[Stats] Ignoring unreadable throughput baselines: {e}")
+
+    def _save(self):
+        if not self.baseline_path:
+            return
+        try:
+            temp_path = self.baseline_path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"baselines": self.baselines, "saved": time.time()}, f, indent=2)
+            os.replace(temp_path, self.baseline_path)
+        except OSError as e:
+            print(f"[Stats] Could not save throughput baselines: {e}")
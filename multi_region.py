@@ -0,0 +1,49 @@
+from typing import List, Sequence, Tuple
+from PIL import Image
+
+Area = Tuple[int, int, int, int]
+
+
+def reading_order(areas: Sequence[Area]) -> List[Area]:
+    """Sort selected areas top-to-bottom, then left-to-right within a row
+
+    An area belongs to a row when its vertical centre falls inside the
+    vertical span of the row's first area, so side-by-side snippets that
+    are not perfectly aligned still read left to right.
+    """
+    rows = []
+    for area in sorted(areas, key=lambda a: (a[1], a[0])):
+        center = (area[1] + area[3]) / 2
+        for row in rows:
+            if row[0][1] <= center <= row[0][3]:
+                row.append(area)
+                break
+        else:
+            rows.append([area])
+    return [area for row in rows for area in sorted(row, key=lambda a: a[0])]
+
+
+def bounding_area(areas: Sequence[Area]) -> Area:
+    """Smallest area containing all selected areas"""
+    return (min(a[0] for a in areas), min(a[1] for a in areas),
+            max(a[2] for a in areas), max(a[3] for a in areas))
+
+
+def stack_regions(images: Sequence[Image.Image], gap: int = 12) -> Image.Image:
+    """Stack region crops vertically (reading order) for the preview tab"""
+    width = max(image.width for image in images)
+    height = sum(image.height for image in images) + gap * (len(images) - 1)
+    sheet = Image.new('RGB', (width, height), 'white')
+    y = 0
+    for image in images:
+        sheet.paste(image, (0, y))
+        y += image.height + gap
+    return sheet
+
+
+def format_region_results(results: Sequence[str]) -> str:
+    """Join per-region Markdown in reading order, marking where each region starts"""
+    if len(results) == 1:
+        return results[0]
+    return "\n\n".join(f"<!-- Region {index} -->\n{text.strip()}"
+                       for index, text in enumerate(results, 1))
@@ -0,0 +1,87 @@
+import itertools
+import time
+from typing import Optional, Tuple
+
+_job_ids = itertools.count(1)
+
+
+class OCRJob:
+    """One capture submitted for OCR, tracked by ID from submission to result"""
+
+    PENDING = "pending"
+    DONE = "done"
+    CANCELLED = "cancelled"
+
+    def __init__(self, image, selected_area: Tuple[int, int, int, int], source: str = "screen",
+                 speculative: bool = False):
+        self.job_id = next(_job_ids)
+        self.image = image
+        self.selected_area = selected_area
+        self.source = source
+        self.status = self.PENDING
+        self.result: Optional[str] = None
+        self.future = None
+        self.submitted_at = time.monotonic()
+        self.completed_at: Optional[float] = None
+        # Speculative jobs start before the user confirms the selection
+        self.speculative = speculative
+        self.confirmed_at: Optional[float] = None if speculative else self.submitted_at
+        # Crops of a multi-region capture, in reading order (image is then the preview sheet)
+        self.region_images = None
+        # Key of the job in the crash-safe job journal, if journaled
+        self.journal_key: Optional[str] = None
+        # Context of the recognition, continued by follow-up refinements
+        self.conversation = None
+        self.refinements = 0
+        # Seconds the latency model expected the recognition to take, if it had an estimate
+        self.expected_latency: Optional[float] = None
+
+    @property
+    def is_pending(self) -> bool:
+        return self.status == self.PENDING
+
+    def complete(self, result: str):
+        """Record the OCR result; the crop is no longer needed for recognition"""
+        self.result = result
+        self.status = self.DONE
+        self.region_images = None
+        self.completed_at = time.monotonic()
+
+    def cancel(self):
+        """Cancel the OCR request if it is still running"""
+        if self.is_pending:
+            self.status = self.CANCELLED
+            self.completed_at = time.monotonic()
+            if self.future:
+                self.future.cancel()
+
+    def confirm(self):
+        """The user confirmed the selection this job was started for"""
+        self.confirmed_at = time.monotonic()
+
+    def refine(self):
+        """Start a follow-up on the finished job; timings restart, the previous result stays"""
+        self.status = self.PENDING
+        self.submitted_at = self.confirmed_at = time.monotonic()
+        self.completed_at = None
+        self.refinements += 1
+
+    def refine_failed(self):
+        """A follow-up failed; the job is finished again with its previous result"""
+        self.status = self.DONE
+        self.completed_at = time.monotonic()
+
+    def latency(self) -> Optional[float]:
+        """Seconds from submission to result"""
+        if self.completed_at is None:
+            return None
+        return self.completed_at - self.submitted_at
+
+    def perceived_latency(self) -> Optional[float]:
+        """Seconds the user waited after confirming (0 if the result was already there)"""
+        if self.completed_at is None or self.confirmed_at is None:
+            return None
+        return max(0.0, self.completed_at - self.confirmed_at)
+
+    def __repr__(self):
+        return f"OCRJob(#{self.job_id}, {self.status}, area={self.selected_area})"
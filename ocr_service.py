@@ -1,26 +1,27 @@
-import requests
+import aiohttp
+import asyncio
 import base64
-import threading
+import concurrent.futures
+import json
+import math
+import os
+import random
+import re
+import time
+from datetime import datetime
 from io import BytesIO
-from typing import Callable, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 from ocr_postprocess import postprocess_ocr_result
-class OCRService:
-    def __init__(self):
-        # Ollama API configuration
-        self.ollama_url = "http://localhost:11434/api/generate"
-        self.model_name = "qwen2.5vl:7b"
-        
-    def image_to_base64(self, image):
-        """Convert PIL image to base64 encoding"""
-        buffer = BytesIO()
-        image.save(buffer, format='PNG')
-        image_bytes = buffer.getvalue()
-        return base64.b64encode(image_bytes).decode('utf-8')
-    
-    def call_ollama_ocr(self, image_base64: str) -> str:
-        """Call Ollama API for OCR recognition"""
-        try:
-            prompt = """Please perform OCR text recognition on the image and strictly follow these output requirements:
+from async_core import AsyncCore
+from circuit_breaker import CircuitBreaker
+from deadline import Deadline
+from generation_guard import GenerationGuard
+from latency_model import LatencyModel
+from model_stats import ModelStats
+from priority_slots import PrioritySlots
+from app_paths import get_diagnostics_dir
+
+OCR_PROMPT = """Please perform OCR text recognition on the image and strictly follow these output requirements:
 1. Output format: Pure Markdown format
 2. Preserve original paragraph structure and line breaks
 3. Mathematical formula format requirements (Important):
@@ -38,49 +39,698 @@ class OCRService:
    - Output recognition results directly
 
 Please strictly follow the above format requirements for output."""
+
+# Several regions in one request: the model separates them with marker lines
+REGION_MARKER = "=== IMAGE {index} ==="
+REGION_MARKER_PATTERN = re.compile(r"^\s*=== IMAGE (\d+) ===\s*$", re.MULTILINE)
+
+MULTI_REGION_PROMPT = OCR_PROMPT + """
+
+There are {count} images. Recognize each image separately, in the order given.
+Before the text of each image, output a line containing only the marker
+""" + REGION_MARKER.format(index="N") + """ where N is the image number (1 to {count})."""
+
+# Follow-up on a finished recognition; sent with the conversation context, without the image
+REFINE_PROMPT = """Revise your previous OCR output following this instruction: {instruction}
+Output the complete revised result in the same Markdown format, without explanations."""
+
+# Follow-up when no context is available: the image is sent again with the previous output
+REFINE_FALLBACK_PROMPT = OCR_PROMPT + """
+
+A previous recognition of this image produced:
+{previous}
+
+Revise it following this instruction: {instruction}
+Output the complete revised result in the same Markdown format, without explanations."""
+
+
+# Outcomes of a single request
+REQUEST_OK = "ok"
+REQUEST_GUARDED = "guarded"  # runaway generation stopped early, output trimmed
+REQUEST_RETRIABLE = "retriable"
+REQUEST_FAILED = "failed"
+
+# Result of regions 2..N when a batched reply could not be split and was kept whole as region 1
+UNSPLIT_REGION_NOTE = "(Not recognized separately - the reply for all regions is under region 1)"
+
+# Failures are returned as text; these are the prefixes the service uses for them
+ERROR_PREFIXES = (
+    "Request timeout:", "OCR service unavailable:", "API call failed:", "Connection failed:",
+    "OCR recognition error:", "OCR recognition failed:", "Recognition failed:",
+    "Refine failed:", "OCR refinement failed:",
+)
+
+
+def is_error_result(text: str) -> bool:
+    """True if a result string is one of the service's failure messages"""
+    return text.startswith(ERROR_PREFIXES)
+
+
+def _payload_bytes(images_base64: List[str], prompt: str, context: Optional[List[int]]) -> int:
+    """Approximate request body size (context token IDs as ~8 JSON characters each)"""
+    return sum(len(image) for image in images_base64) + len(prompt) + 8 * len(context or [])
+
+
+def split_region_results(text: str, count: int) -> Optional[List[str]]:
+    """Split a multi-image response at its region markers; None if they are missing"""
+    markers = list(REGION_MARKER_PATTERN.finditer(text))
+    if [int(m.group(1)) for m in markers] != list(range(1, count + 1)):
+        return None
+    ends = [m.start() for m in markers[1:]] + [len(text)]
+    return [text[m.end():end].strip() for m, end in zip(markers, ends)]
+
+
+class OCRConversation:
+    """What a follow-up request needs from a finished recognition
+    
+    context holds the token IDs Ollama returns with a completed generation.
+    Sent back with the next prompt, they let Ollama continue the
+    conversation (its KV cache still holds the prompt and image), so the
+    image is neither uploaded nor encoded again. Replies without context
+    (generations stopped by the guard, multi-region requests) leave it None.
+    """
+    
+    def __init__(self):
+        self.context: Optional[List[int]] = None
+
+
+class OCRService:
+    def __init__(self, core: Optional[AsyncCore] = None):
+        # Ollama API configuration
+        self.ollama_url = "http://localhost:11434/api/generate"
+        self.model_name = "qwen2.5vl:7b"
+        
+        # Time budget per OCR job (seconds) - covers encoding, queueing, retries and backoff.
+        # See job_budget(): at least default_budget, more for requests the latency model
+        # expects to be slow, plus cold_start_allowance while the model may be unloaded
+        self.default_budget = 120.0
+        self.budget_factor = 4.0
+        self.cold_start_allowance = 120.0
+        # Ollama unloads a model after this long without requests (its keep_alive default)
+        self.model_keep_alive = 300.0
+        self._last_response_at: Optional[float] = None
+        self.connect_timeout = 3.0
+        
+        # Retry policy: full-jitter exponential backoff, only while budget remains
+        self.max_retries = 2
+        self.backoff_base = 0.5
+        self.backoff_cap = 4.0
+        
+        # Fail fast for a cool-down period after repeated connection errors/timeouts
+        self.circuit_breaker = CircuitBreaker(failure_threshold=3, cooldown=30.0)
+        
+        # All network I/O runs on one asyncio loop; jobs beyond this limit wait their turn
+        self.max_concurrent_requests = 2
+        self.core = core or AsyncCore()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._request_slots: Optional[PrioritySlots] = None
+        
+        # Multi-region captures: "batched" sends one multi-image request, "concurrent"
+        # one request per region, "auto" batches small regions unless the backend
+        # runs enough requests in parallel (OLLAMA_NUM_PARALLEL)
+        self.multi_region_policy = "auto"
+        self.max_batch_images = 4
+        self.max_batch_pixels = 1_000_000
+        self.backend_parallel = 1
+        
+        # Stream responses and stop runaway (repetitive) generations early; one retry
+        # with other sampling options, keeping the trimmed output if that fails too
+        self.stream_guard = True
+        self.max_output_tokens = 4096
+        self.guard_retry_options = {"temperature": 0.3, "repeat_penalty": 1.3}
+        self.guard_log_enabled = True
+        self.guard_stats = {'activations': 0, 'retries': 0, 'saved_seconds': 0.0, 'reasons': {}}
+        
+        # Latency learned from completed requests: ETAs, retry planning, and the order in
+        # which waiting requests get a slot (interactive first, then shortest expected).
+        # In memory only; the app replaces it with a persisted one
+        self.latency_model = LatencyModel()
+        self.shortest_job_first = True
+        self.encode_seconds_per_pixel = 0.0  # running average of PNG encoding cost, for ETAs
+        # Further Ollama servers with the same model; each request goes to the one
+        # expected to finish it first (they share the circuit breaker)
+        self.extra_endpoints: List[str] = []
+        self._in_flight: Dict[str, int] = {}
+        self._outstanding: Dict[object, Tuple[float, Optional[float], bool]] = {}  # expected, started, interactive
+        
+        # Ollama's own token counts and timings per request, with throughput regression alerts.
+        # In memory only; the app replaces it with one that keeps a log and baselines
+        self.model_stats = ModelStats()
+        self._background_tasks = set()
+        
+    def image_to_base64(self, image):
+        """Convert PIL image to base64 encoding"""
+        buffer = BytesIO()
+        image.save(buffer, format='PNG')
+        image_bytes = buffer.getvalue()
+        return base64.b64encode(image_bytes).decode('utf-8')
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Shared HTTP session (event loop thread only)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrent_requests)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._request_slots = PrioritySlots(self.max_concurrent_requests)
+        return self._session
+    
+    def call_ollama_ocr(self, image_base64: str, deadline: Optional[Deadline] = None) -> str:
+        """Call Ollama API for OCR recognition (blocking facade over the async core)"""
+        return self.core.run(self.call_ollama_ocr_async(image_base64, deadline))
+    
+    async def call_ollama_ocr_async(self, image_base64: str, deadline: Optional[Deadline] = None,
+                                    image_pixels: Optional[int] = None,
+                                    conversation: Optional[OCRConversation] = None) -> str:
+        """Call Ollama API for OCR recognition within the job deadline"""
+        return await self._generate([image_base64], OCR_PROMPT, deadline, image_pixels, conversation)
+    
+    async def _generate(self, images_base64: List[str], prompt: str,
+                        deadline: Optional[Deadline] = None, image_pixels: Optional[int] = None,
+                        conversation: Optional[OCRConversation] = None) -> str:
+        """One generate call with retries, backoff and the circuit breaker
+        
+        With a conversation, the request continues from its context and the
+        context of a successful reply is stored back into it.
+        """
+        if deadline is None:
+            deadline = Deadline(self.job_budget())
+        
+        attempt = 0
+        options = None
+        guarded_result = None  # trimmed output of a stopped generation, kept if the retry fails
+        payload_bytes = _payload_bytes(images_base64, prompt, conversation.context if conversation else None)
+        while True:
+            # Checked first, so an expired job never takes the half-open probe
+            if deadline.expired():
+                if guarded_result is not None:
+                    return guarded_result
+                return "Request timeout: OCR deadline exceeded"
             
-            payload = {
-                "model": self.model_name,
-                "prompt": prompt,
-                "images": [image_base64],
-                "stream": False
-            }
+            if not self.circuit_breaker.allow_request():
+                if guarded_result is not None:
+                    return guarded_result
+                return (f"OCR service unavailable: too many recent failures, "
+                        f"retrying in {self.circuit_breaker.remaining_cooldown():.0f}s")
+            # Still half-open after being let through means this request is the probe
+            probing = self.circuit_breaker.state == CircuitBreaker.HALF_OPEN
             
-            response = requests.post(self.ollama_url, json=payload, timeout=600)
+            context = conversation.context if conversation else None
+            try:
+                result, outcome, reply = await self._post_ocr_request(images_base64, prompt, deadline,
+                                                                      image_pixels, options, context)
+            finally:
+                if probing:
+                    # No-op after a success or failure; otherwise (4xx, error, queue
+                    # timeout, cancellation) the next job may probe
+                    self.circuit_breaker.release_probe()
+            if conversation and outcome in (REQUEST_OK, REQUEST_GUARDED):
+                # A trimmed reply has no context that matches what the user sees
+                conversation.context = reply.get('context') if reply else None
+            # A retry is only worth it if a request this size can still finish in time
+            needed = max(self.connect_timeout, self.expected_request_latency(image_pixels, payload_bytes) or 0.0)
+            if (outcome == REQUEST_GUARDED and guarded_result is None and self.guard_retry_options
+                    and deadline.remaining() > needed):
+                # Repetition loops depend on sampling - try once more with other options
+                guarded_result = result
+                options = self.guard_retry_options
+                self.guard_stats['retries'] += 1
+                print("[OCR] Retrying once with different sampling options")
+                continue
+            if outcome in (REQUEST_OK, REQUEST_GUARDED):
+                return result
+            if guarded_result is not None:
+                return guarded_result
+            if outcome == REQUEST_FAILED:
+                return result
+            
+            # Retry only if there is budget left for the backoff plus the expected request time
+            backoff = random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+            attempt += 1
+            if attempt > self.max_retries:
+                return result
+            if deadline.remaining() <= backoff + needed:
+                if needed > self.connect_timeout:
+                    print(f"[OCR] Not retrying: {deadline.remaining():.1f}s left, a request takes ~{needed:.1f}s")
+                return result
             
-            if response.status_code == 200:
-                result = response.json()
-                print("[OCR] Recognition successful")
-                return result.get('response', 'Recognition failed: No response content')
-            else:
-                return f"API call failed: Status code {response.status_code}"
+            print(f"[OCR] Retrying in {backoff:.2f}s (attempt {attempt}/{self.max_retries}, "
+                  f"{deadline.remaining():.1f}s budget left)")
+            await asyncio.sleep(backoff)
+    
+    async def _post_ocr_request(self, images_base64: List[str], prompt: str, deadline: Deadline,
+                                image_pixels: Optional[int] = None, options: Optional[dict] = None,
+                                context: Optional[List[int]] = None):
+        """Send one OCR request; returns (result text, REQUEST_* outcome, final reply or None)
+        
+        The final reply is the last streamed chunk (or the whole non-streamed
+        response) and carries Ollama's context and timing fields.
+        """
+        session = self._get_session()
+        payload = {
+            "model": self.model_name,
+            "prompt": prompt,
+            "images": images_base64,
+            "stream": self.stream_guard,
+            "options": {"num_predict": self.max_output_tokens, **(options or {})}
+        }
+        if context:
+            payload["context"] = context
+        payload_bytes = _payload_bytes(images_base64, prompt, context)
+        
+        # Interactive jobs before background ones; among them shortest expected first,
+        # without letting a job be passed by one submitted after it would have finished
+        ticket = object()
+        _, expected = self._choose_endpoint(image_pixels, payload_bytes)
+        self._outstanding[ticket] = (expected or 0.0, None, deadline.interactive)
+        priority = (0 if deadline.interactive else 1,
+                    time.monotonic() + ((expected or 0.0) if self.shortest_job_first else 0.0))
+        try:
+            # Waiting for a request slot counts against the job deadline
+            await asyncio.wait_for(self._request_slots.acquire(priority), deadline.remaining())
+        except asyncio.TimeoutError:
+            del self._outstanding[ticket]
+            return "Request timeout: OCR queue wait exceeded the deadline", REQUEST_FAILED, None
+        except asyncio.CancelledError:
+            del self._outstanding[ticket]
+            raise
+        
+        # Load may have changed while waiting
+        endpoint, expected = self._choose_endpoint(image_pixels, payload_bytes)
+        self._in_flight[endpoint] = self._in_flight.get(endpoint, 0) + 1
+        started = time.monotonic()
+        self._outstanding[ticket] = (expected or 0.0, started, deadline.interactive)
+        try:
+            result, outcome, reply = await self._send_request(session, endpoint, payload, deadline, image_pixels)
+        finally:
+            self._in_flight[endpoint] -= 1
+            del self._outstanding[ticket]
+            self._request_slots.release()
+        if outcome in (REQUEST_OK, REQUEST_GUARDED):
+            # The model answered, so it is loaded for the next keep-alive period
+            self._last_response_at = time.monotonic()
+        if outcome == REQUEST_OK:
+            elapsed = time.monotonic() - started
+            self.latency_model.observe(endpoint, self.model_name, image_pixels, payload_bytes, elapsed, expected)
+            self.model_stats.record(endpoint, self.model_name, reply, elapsed, image_pixels, len(images_base64))
+            if endpoint not in self.model_stats.versions:
+                self.model_stats.versions[endpoint] = None
+                task = asyncio.ensure_future(self._fetch_backend_version(session, endpoint))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+        return result, outcome, reply
+    
+    async def _fetch_backend_version(self, session: aiohttp.ClientSession, endpoint: str):
+        """Record the Ollama version and model digest behind an endpoint, for regression reports"""
+        base = endpoint.rsplit("/api/", 1)[0]
+        timeout = aiohttp.ClientTimeout(total=self.connect_timeout)
+        try:
+            async with session.get(f"{base}/api/version", timeout=timeout) as response:
+                version = f"Ollama {(await response.json()).get('version', 'unknown')}"
+            async with session.get(f"{base}/api/tags", timeout=timeout) as response:
+                models = (await response.json()).get("models", [])
+            digest = next((model.get("digest") for model in models if model.get("name") == self.model_name), None)
+            if digest:
+                version += f", model {digest[:12]}"
+            self.model_stats.versions[endpoint] = version
+            print(f"[OCR] Backend at {base}: {version}")
+        except Exception as e:
+            print(f"[OCR] Could not read the backend version: {e}")
+    
+    async def _send_request(self, session: aiohttp.ClientSession, endpoint: str, payload: dict,
+                            deadline: Deadline, image_pixels: Optional[int]):
+        """POST one generate request and read the reply (see _post_ocr_request)"""
+        try:
+            # Connection attempts are short; reading may use the rest of the budget
+            # aiohttp rounds timeouts of at least ceil_threshold (default 5s) up to the
+            # next whole second, which would overshoot the job deadline
+            timeout = aiohttp.ClientTimeout(
+                total=deadline.remaining(),
+                sock_connect=deadline.timeout(self.connect_timeout),
+                ceil_threshold=math.inf
+            )
+            async with session.post(endpoint, json=payload, timeout=timeout) as response:
+                if response.status == 200:
+                    if self.stream_guard:
+                        guard, reply = await self._read_stream(response, image_pixels)
+                        self.circuit_breaker.record_success()
+                        if guard.reason:
+                            return guard.trimmed_text(), REQUEST_GUARDED, None
+                        print("[OCR] Recognition successful")
+                        return guard.text, REQUEST_OK, reply
+                    result = await response.json()
+                    self.circuit_breaker.record_success()
+                    print("[OCR] Recognition successful")
+                    return result.get('response', 'Recognition failed: No response content'), REQUEST_OK, result
+                elif response.status >= 500:
+                    # Overloaded or crashed backend counts against the breaker
+                    self.circuit_breaker.record_failure()
+                    return f"API call failed: Status code {response.status}", REQUEST_RETRIABLE, None
+                else:
+                    return f"API call failed: Status code {response.status}", REQUEST_FAILED, None
                 
-        except requests.exceptions.ConnectionError:
-            return "Connection failed: Please ensure Ollama service is running (http://localhost:11434)"
-        except requests.exceptions.Timeout:
-            return "Request timeout: OCR recognition took too long"
+        except asyncio.TimeoutError:
+            self.circuit_breaker.record_failure()
+            return "Request timeout: OCR recognition took too long", REQUEST_RETRIABLE, None
+        except aiohttp.ClientConnectionError:
+            self.circuit_breaker.record_failure()
+            return ("Connection failed: Please ensure Ollama service is running (http://localhost:11434)",
+                    REQUEST_RETRIABLE, None)
         except Exception as e:
-            return f"OCR recognition error: {str(e)}"
+            return f"OCR recognition error: {str(e)}", REQUEST_FAILED, None
+    
+    def _choose_endpoint(self, image_pixels: Optional[int], payload_bytes: Optional[int] = None):
+        """Endpoint expected to finish a request soonest, with its expected latency
+        
+        An endpoint without observations is tried first so it gets a fit;
+        otherwise the expected latency is scaled by the requests already
+        running there.
+        """
+        best = None
+        for endpoint in [self.ollama_url] + self.extra_endpoints:
+            expected = self.latency_model.predict(endpoint, self.model_name, image_pixels, payload_bytes)
+            if expected is None:
+                return endpoint, None
+            load = expected * (self._in_flight.get(endpoint, 0) + 1)
+            if best is None or load < best[0]:
+                best = (load, endpoint, expected)
+        return best[1], best[2]
+    
+    def expected_request_latency(self, image_pixels: Optional[int],
+                                 payload_bytes: Optional[int] = None) -> Optional[float]:
+        """Expected seconds for one request of this size, None while unknown"""
+        return self._choose_endpoint(image_pixels, payload_bytes)[1]
+    
+    def estimate_latency(self, images) -> Optional[float]:
+        """Expected seconds until a job submitted now for these crops has its result
+        
+        Includes the wait for a request slot behind the requests already
+        queued or running. None until the latency model has observations.
+        """
+        if not images:
+            return None
+        pixels = total_pixels = sum(image.width * image.height for image in images)
+        if len(images) > 1 and self.choose_region_policy(images) == "concurrent":
+            # Regions run side by side; the largest one decides
+            pixels = max(image.width * image.height for image in images)
+        expected = self.expected_request_latency(pixels)
+        if expected is None:
+            return None
+        return total_pixels * self.encode_seconds_per_pixel + expected + self._queue_delay(expected)
+    
+    def model_may_be_cold(self) -> bool:
+        """True if Ollama may have to load the model first (no reply yet, or idle past keep-alive)"""
+        return (self._last_response_at is None
+                or time.monotonic() - self._last_response_at > self.model_keep_alive)
+    
+    def job_budget(self, images=None) -> float:
+        """Deadline budget for a job submitted now for these crops
+        
+        default_budget, or budget_factor times the expected latency when the
+        latency model expects more, plus cold_start_allowance when the model
+        may need loading - so a slow CPU backend or a cold start does not
+        time out and trip the circuit breaker.
+        """
+        budget = self.default_budget
+        expected = self.estimate_latency(images) if images else None
+        if expected is not None:
+            budget = max(budget, self.budget_factor * expected)
+        if self.model_may_be_cold():
+            budget += self.cold_start_allowance
+        return budget
+    
+    def _record_encoding(self, pixels: int, elapsed: float):
+        """Update the running average of PNG encoding time per pixel"""
+        if pixels:
+            rate = elapsed / pixels
+            self.encode_seconds_per_pixel += (rate - self.encode_seconds_per_pixel) * (
+                0.2 if self.encode_seconds_per_pixel else 1.0)
+    
+    def _queue_delay(self, expected: float) -> float:
+        """Rough wait of a new interactive request for a slot
+        
+        The remaining expected time of the running requests plus the waiting
+        ones it will not pass, spread over the slots.
+        """
+        outstanding = list(self._outstanding.values())
+        running = [(queued, started) for queued, started, _ in outstanding if started is not None]
+        ahead = [queued for queued, started, interactive in outstanding
+                 if started is None and interactive and (not self.shortest_job_first or queued <= expected)]
+        if len(running) < self.max_concurrent_requests and not ahead:
+            return 0.0
+        now = time.monotonic()
+        remaining = sum(max(0.0, queued - (now - started)) for queued, started in running) + sum(ahead)
+        return remaining / self.max_concurrent_requests
+    
+    async def _read_stream(self, response, image_pixels: Optional[int]):
+        """Read a streamed generation, stopping it as soon as the guard fires
+        
+        Returns the guard (holding the text) and the final chunk, or None if
+        the generation was stopped.
+        """
+        guard = GenerationGuard(image_pixels)
+        reply = None
+        first_token_at = None
+        async for line in response.content:
+            if not line.strip():
+                continue
+            chunk = json.loads(line)
+            if 'error' in chunk:
+                raise RuntimeError(chunk['error'])
+            if first_token_at is None:
+                first_token_at = time.monotonic()
+            if guard.feed(chunk.get('response', '')):
+                # Dropping the connection makes Ollama stop generating
+                response.close()
+                self._record_guard_activation(guard, time.monotonic() - first_token_at, image_pixels)
+                break
+            if chunk.get('done'):
+                reply = chunk
+                # Ran into num_predict: a repeating tail is a loop the length bound did not catch
+                hit_limit = chunk.get('done_reason') == 'length' or chunk.get('eval_count', 0) >= self.max_output_tokens
+                if hit_limit and guard.check_limit():
+                    self._record_guard_activation(guard, time.monotonic() - first_token_at, image_pixels)
+                break
+        return guard, reply
+    
+    def _record_guard_activation(self, guard: GenerationGuard, elapsed: float, image_pixels: Optional[int]):
+        """Count a stopped generation and log it for threshold tuning
+        
+        Time saved is estimated from the observed token rate, assuming the
+        loop would have run to max_output_tokens.
+        """
+        saved = max(0, self.max_output_tokens - guard.tokens) * elapsed / max(1, guard.tokens)
+        stats = self.guard_stats
+        stats['activations'] += 1
+        stats['saved_seconds'] += saved
+        stats['reasons'][guard.reason] = stats['reasons'].get(guard.reason, 0) + 1
+        print(f"[OCR] Generation guard: {guard.reason} after {guard.tokens} tokens ({elapsed:.1f}s), "
+              f"~{saved:.0f}s saved")
+        
+        if not self.guard_log_enabled:
+            return
+        record = {
+            "time": datetime.now().isoformat(timespec='seconds'),
+            "model": self.model_name,
+            "reason": guard.reason,
+            "tokens": guard.tokens,
+            "chars": len(guard.text),
+            "kept_chars": len(guard.trimmed_text()),
+            "image_pixels": image_pixels,
+            "elapsed": round(elapsed, 3),
+            "estimated_saved": round(saved, 1)
+        }
+        try:
+            with open(os.path.join(get_diagnostics_dir(), "generation_guard.jsonl"), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            print(f"[OCR] Could not write guard log: {e}")
+    
+    def describe_guard(self) -> str:
+        """Summary line for status output"""
+        if not self.stream_guard:
+            return "Off"
+        stats = self.guard_stats
+        reasons = ", ".join(f"{reason}: {count}" for reason, count in stats['reasons'].items())
+        return (f"{stats['activations']} runaway generations stopped ({reasons or 'none'}), "
+                f"{stats['retries']} retries, ~{stats['saved_seconds']:.0f}s saved")
+    
+    async def recognize(self, image, deadline: Optional[Deadline] = None,
+                        conversation: Optional[OCRConversation] = None) -> str:
+        """Full OCR pipeline for one image: encode, call Ollama, post-process"""
+        if deadline is None:
+            deadline = Deadline(self.job_budget([image]))
+        
+        # PNG encoding is CPU-bound - keep it off the event loop
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        image_base64 = await loop.run_in_executor(None, self.image_to_base64, image)
+        self._record_encoding(image.width * image.height, time.monotonic() - started)
+        
+        result = await self.call_ollama_ocr_async(image_base64, deadline, image.width * image.height,
+                                                  conversation)
+        return postprocess_ocr_result(result)
+    
+    async def refine(self, instruction: str, previous_result: str, conversation: OCRConversation,
+                     image=None, deadline: Optional[Deadline] = None) -> str:
+        """Follow-up on a finished recognition ("re-read the second formula", "output as a table")
+        
+        Continues from the conversation context when there is one, so only
+        the instruction is processed; otherwise the image is sent again with
+        the previous output.
+        """
+        if deadline is None:
+            deadline = Deadline(self.job_budget([image] if image is not None else None))
+        
+        if conversation.context:
+            print(f"[OCR] Refining with the previous context ({len(conversation.context)} tokens), "
+                  f"image not re-sent")
+            result = await self._generate([], REFINE_PROMPT.format(instruction=instruction),
+                                          deadline, None, conversation)
+        elif image is not None:
+            print("[OCR] No context to continue from, refining with the image re-sent")
+            loop = asyncio.get_running_loop()
+            image_base64 = await loop.run_in_executor(None, self.image_to_base64, image)
+            prompt = REFINE_FALLBACK_PROMPT.format(previous=previous_result, instruction=instruction)
+            result = await self._generate([image_base64], prompt, deadline,
+                                          image.width * image.height, conversation)
+        else:
+            return "Refine failed: no context and the image is no longer held"
+        return postprocess_ocr_result(result)
+    
+    def choose_region_policy(self, images) -> str:
+        """Batch small regions into one request; send large ones concurrently
+        
+        A batched request pays the per-request overhead (HTTP, scheduling,
+        prompt evaluation) once, but its regions finish together and one bad
+        response affects all of them. A backend that serves the requests in
+        parallel finishes separate requests sooner.
+        """
+        if self.multi_region_policy != "auto":
+            return self.multi_region_policy
+        parallel = min(self.backend_parallel, self.max_concurrent_requests)
+        pixels = sum(image.width * image.height for image in images)
+        if (parallel < len(images) and len(images) <= self.max_batch_images
+                and pixels <= self.max_batch_pixels):
+            return "batched"
+        return "concurrent"
+    
+    async def recognize_regions(self, images, deadline: Optional[Deadline] = None,
+                                policy: Optional[str] = None) -> List[str]:
+        """OCR several regions; returns one Markdown result per region, in input order"""
+        if deadline is None:
+            deadline = Deadline(self.job_budget(images))
+        policy = policy or self.choose_region_policy(images)
+        
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        encoded = await asyncio.gather(
+            *(loop.run_in_executor(None, self.image_to_base64, image) for image in images)
+        )
+        self._record_encoding(sum(image.width * image.height for image in images), time.monotonic() - started)
+        
+        if policy == "batched" and len(images) > 1:
+            print(f"[OCR] Recognizing {len(images)} regions in one request")
+            prompt = MULTI_REGION_PROMPT.format(count=len(images))
+            pixels = sum(image.width * image.height for image in images)
+            result = await self._generate(list(encoded), prompt, deadline, pixels)
+            parts = split_region_results(result, len(images))
+            if parts is not None:
+                return [postprocess_ocr_result(part) for part in parts]
+            if deadline.expired() or self.circuit_breaker.state != CircuitBreaker.CLOSED:
+                # No time or backend for per-region requests: keep the reply once, not under every region
+                return [postprocess_ocr_result(result)] + [UNSPLIT_REGION_NOTE] * (len(images) - 1)
+            print("[OCR] Batched response has no region markers, retrying one request per region")
+        
+        print(f"[OCR] Recognizing {len(images)} regions as concurrent requests")
+        results = await asyncio.gather(
+            *(self.call_ollama_ocr_async(image_base64, deadline, image.width * image.height)
+              for image_base64, image in zip(encoded, images))
+        )
+        return [postprocess_ocr_result(result) for result in results]
     
-    def recognize_async(self, image, callback: Callable[[str], None]):
-        """Perform OCR recognition asynchronously"""
-        def ocr_worker():
+    def recognize_async(self, image, callback: Callable[[str], None],
+                        deadline: Optional[Deadline] = None,
+                        conversation: Optional[OCRConversation] = None) -> concurrent.futures.Future:
+        """Perform OCR recognition asynchronously
+        
+        The callback runs on the event loop thread; wrap it with a TkDispatcher
+        to touch Tk widgets. Cancelling the returned future cancels the job
+        and suppresses the callback.
+        """
+        # The budget starts at submission so encoding time counts against it
+        if deadline is None:
+            deadline = Deadline(self.job_budget([image]))
+        
+        async def ocr_job():
+            print("[OCR] Starting async recognition")
             try:
-                print("[OCR] Starting async recognition")
-                # Convert image to base64
-                image_base64 = self.image_to_base64(image)
-                
-                # Call Ollama for OCR
-                result = self.call_ollama_ocr(image_base64)
-                result = postprocess_ocr_result(result)
-                # Execute callback with result
-                callback(result)
-                
+                return await self.recognize(image, deadline, conversation)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                return f"OCR recognition failed: {str(e)}"
+        
+        return self._submit(ocr_job(), callback)
+    
+    def refine_async(self, instruction: str, previous_result: str, conversation: OCRConversation,
+                     callback: Callable[[str], None], image=None,
+                     deadline: Optional[Deadline] = None) -> concurrent.futures.Future:
+        """Send a follow-up on a finished recognition asynchronously (see refine)"""
+        if deadline is None:
+            deadline = Deadline(self.job_budget([image] if image is not None else None))
+        
+        async def refine_job():
+            print(f"[OCR] Starting refinement: {instruction}")
+            try:
+                return await self.refine(instruction, previous_result, conversation, image, deadline)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                return f"OCR refinement failed: {str(e)}"
+        
+        return self._submit(refine_job(), callback)
+    
+    def recognize_regions_async(self, images, callback: Callable[[List[str]], None],
+                                deadline: Optional[Deadline] = None,
+                                policy: Optional[str] = None) -> concurrent.futures.Future:
+        """Recognize several regions asynchronously; the callback gets one result per region"""
+        if deadline is None:
+            deadline = Deadline(self.job_budget(images))
+        
+        async def regions_job():
+            print(f"[OCR] Starting async recognition of {len(images)} regions")
+            try:
+                return await self.recognize_regions(images, deadline, policy)
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                error_msg = f"OCR recognition failed: {str(e)}"
-                callback(error_msg)
+                return [f"OCR recognition failed: {str(e)}"] * len(images)
+        
+        return self._submit(regions_job(), callback)
+    
+    def _submit(self, coroutine, callback: Callable) -> concurrent.futures.Future:
+        """Run an OCR coroutine on the async core and hand its result to callback"""
+        def on_done(future):
+            if future.cancelled():
+                print("[OCR] Recognition cancelled")
+                return
+            callback(future.result())
+        
+        future = self.core.submit(coroutine)
+        future.add_done_callback(on_done)
+        print("[OCR] OCR job queued on async core")
+        return future
+    
+    def close(self):
+        """Close the HTTP session, stop the event loop and save the latency model"""
+        self.latency_model.save()
+        
+        async def close_session():
+            if self._session and not self._session.closed:
+                await self._session.close()
         
-        # Start OCR in background thread
-        thread = threading.Thread(target=ocr_worker, daemon=True)
-        thread.start()
-        print("[OCR] Background OCR thread started")
\ No newline at end of file
+        if self.core.loop and self.core.loop.is_running():
+            try:
+                self.core.run(close_session(), timeout=2.0)
+            except Exception as e:
+                print(f"[OCR] Error closing HTTP session: {e}")
+            self.core.stop()
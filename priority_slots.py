@@ -0,0 +1,40 @@
+import asyncio
+import heapq
+import itertools
+
+
+class PrioritySlots:
+    """Request slots handed out by priority instead of arrival order (event loop thread only)
+
+    acquire() returns at once while a slot is free. Otherwise the caller
+    waits, and each released slot goes to the waiter with the lowest
+    priority value; ties keep arrival order.
+    """
+
+    def __init__(self, slots: int):
+        self.free = slots
+        self._waiters = []  # heap of (priority, arrival, future)
+        self._arrivals = itertools.count()
+
+    async def acquire(self, priority=()):
+        # Slots are only free while nobody waits (release hands them to waiters first)
+        if self.free > 0:
+            self.free -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._arrivals), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted a slot while being cancelled (e.g. wait_for timeout) - pass it on
+                self.release()
+            raise
+
+    def release(self):
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.free += 1
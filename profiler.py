@@ -0,0 +1,254 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from app_paths import get_diagnostics_dir
+
+# cProfile hooks every thread at once from Python 3.12 (sys.monitoring)
+CPROFILE_ALL_THREADS = sys.version_info >= (3, 12)
+
+
+class StackSampler:
+    """Sample the stacks of all threads at a fixed rate into collapsed-stack counts"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name="StackSampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(1.0)
+            self._thread = None
+
+    def _sample_loop(self):
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                self.stacks[self._collapse(names.get(thread_id, str(thread_id)), frame)] += 1
+            self.samples += 1
+
+    @staticmethod
+    def _collapse(thread_name, frame) -> str:
+        """Render one stack as 'thread;outer;...;inner' (flamegraph.pl format)"""
+        parts = []
+        while frame is not None:
+            code = frame.f_code
+            parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        parts.append(thread_name)
+        return ";".join(reversed(parts)).replace(" ", "_")
+
+    def write_collapsed(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class ProfilingSession:
+    """Profiling started and stopped at runtime (tray menu)
+
+    Nothing is installed while no session is running, so the profiler costs
+    nothing when off. A session always samples all threads for a collapsed
+    stack (flamegraph) file; in 'cprofile' mode it also records deterministic
+    pstats, and it can optionally track allocations with tracemalloc.
+
+    thread_runners execute a function on a thread the application owns (Tk
+    main loop, OCR event loop); before Python 3.12 cProfile only sees the
+    thread it was enabled on, so it is enabled on each of them.
+    """
+
+    SAMPLING = "sampling"
+    CPROFILE = "cprofile"
+
+    def __init__(self, thread_runners: Optional[List[Callable[[Callable], None]]] = None):
+        self.thread_runners = thread_runners or []
+        self.mode: Optional[str] = None
+        self.trace_memory = False
+        self.started_at: Optional[datetime] = None
+        self._sampler: Optional[StackSampler] = None
+        self._profiles: Dict[int, cProfile.Profile] = {}  # thread ident -> profile
+        self._runner_threads: Dict[int, int] = {}  # thread_runners index -> thread ident
+        self._started_tracemalloc = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_active(self) -> bool:
+        return self.mode is not None
+
+    def start(self, mode: str = SAMPLING, trace_memory: bool = False):
+        """Start a session; ignored if one is already running"""
+        with self._lock:
+            if self.is_active:
+                print("[Profiler] Session already running")
+                return
+            self.mode = mode
+            self.trace_memory = trace_memory
+            self.started_at = datetime.now()
+            self._profiles = {}
+            self._runner_threads = {}
+
+            if trace_memory and not tracemalloc.is_tracing():
+                tracemalloc.start(25)
+                self._started_tracemalloc = True
+
+            if mode == self.CPROFILE:
+                if CPROFILE_ALL_THREADS:
+                    self._enable_profile()
+                else:
+                    for index, runner in enumerate(self.thread_runners):
+                        runner(lambda index=index: self._enable_profile(index))
+
+            self._sampler = StackSampler()
+            self._sampler.start()
+        print(f"[Profiler] {mode} session started (allocations: {'on' if trace_memory else 'off'})")
+
+    def _enable_profile(self, runner_index: Optional[int] = None):
+        """Enable a cProfile profiler on the calling thread"""
+        if self.mode != self.CPROFILE:
+            # Queued on a loop that only ran it after the session stopped
+            return
+        profile = cProfile.Profile()
+        profile.enable()
+        self._profiles[threading.get_ident()] = profile
+        if runner_index is not None:
+            self._runner_threads[runner_index] = threading.get_ident()
+
+    def _disable_current_profile(self):
+        """Disable the profiler enabled on the calling thread, if any"""
+        profile = self._profiles.get(threading.get_ident())
+        if profile:
+            profile.disable()
+
+    def _disable_profiles(self):
+        """Disable profiles (each on the thread it was enabled on before 3.12)"""
+        if CPROFILE_ALL_THREADS or not self.thread_runners:
+            for profile in self._profiles.values():
+                profile.disable()
+            return
+
+        done = []
+        for index, runner in enumerate(self.thread_runners):
+            thread = self._runner_threads.get(index)
+            if thread is None:
+                # The runner never ran the enable call (e.g. Tk loop not started)
+                continue
+            if thread == threading.get_ident():
+                # Posting to our own thread would wait for a loop that is not running
+                # (e.g. the Tk thread stopping the session after mainloop returned)
+                self._disable_current_profile()
+                continue
+            finished = threading.Event()
+
+            def disable_on_thread(finished=finished):
+                try:
+                    self._disable_current_profile()
+                finally:
+                    finished.set()
+            runner(disable_on_thread)
+            done.append(finished)
+        for finished in done:
+            if not finished.wait(2.0):
+                print("[Profiler] Warning: a profiled thread did not respond")
+
+    def stop(self) -> Optional[str]:
+        """Stop the session and write the report; returns the report folder"""
+        with self._lock:
+            if not self.is_active:
+                print("[Profiler] No session running")
+                return None
+
+            duration = (datetime.now() - self.started_at).total_seconds()
+            self._sampler.stop()
+            if self._profiles:
+                self._disable_profiles()
+
+            snapshot = None
+            if self.trace_memory and tracemalloc.is_tracing():
+                snapshot = tracemalloc.take_snapshot()
+                if self._started_tracemalloc:
+                    tracemalloc.stop()
+                    self._started_tracemalloc = False
+
+            report_dir = os.path.join(
+                get_diagnostics_dir(), f"profile_{self.started_at.strftime('%Y%m%d_%H%M%S')}"
+            )
+            os.makedirs(report_dir, exist_ok=True)
+            self._write_report(report_dir, duration, snapshot)
+
+            mode = self.mode
+            self.mode = None
+            self._sampler = None
+            self._profiles = {}
+            self._runner_threads = {}
+        print(f"[Profiler] {mode} session stopped, report written to {report_dir}")
+        return report_dir
+
+    def _write_report(self, report_dir: str, duration: float, snapshot):
+        summary = [
+            f"Mode: {self.mode}",
+            f"Started: {self.started_at.isoformat(timespec='seconds')}",
+            f"Duration: {duration:.1f}s",
+            f"Stack samples: {self._sampler.samples}",
+        ]
+
+        # Collapsed stacks - feed to flamegraph.pl or speedscope
+        self._sampler.write_collapsed(os.path.join(report_dir, "stacks.collapsed"))
+
+        # Deterministic profile
+        if self._profiles:
+            profiles = list(self._profiles.values())
+            stats = pstats.Stats(profiles[0])
+            for profile in profiles[1:]:
+                stats.add(profile)
+            stats.dump_stats(os.path.join(report_dir, "cprofile.pstats"))
+            text = io.StringIO()
+            pstats.Stats(os.path.join(report_dir, "cprofile.pstats"), stream=text) \
+                .sort_stats("cumulative").print_stats(40)
+            with open(os.path.join(report_dir, "cprofile.txt"), 'w', encoding='utf-8') as f:
+                f.write(text.getvalue())
+            summary.append(f"cProfile threads: {'all' if CPROFILE_ALL_THREADS else len(self._profiles)}")
+
+        # Top allocation sites
+        if snapshot is not None:
+            snapshot = snapshot.filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            ])
+            top_stats = snapshot.statistics('lineno')
+            with open(os.path.join(report_dir, "allocations.txt"), 'w', encoding='utf-8') as f:
+                f.write(f"Traced: {sum(stat.size for stat in top_stats) / 1e6:.2f} MB\n\n")
+                for stat in top_stats[:30]:
+                    f.write(f"{stat}\n")
+                f.write("\nTop 5 by traceback:\n")
+                for stat in snapshot.statistics('traceback')[:5]:
+                    f.write(f"\n{stat.size / 1024:.1f} KiB in {stat.count} blocks\n")
+                    f.write("\n".join(stat.traceback.format()) + "\n")
+            summary.append(f"Allocations traced: {len(top_stats)} sites")
+
+        with open(os.path.join(report_dir, "summary.txt"), 'w', encoding='utf-8') as f:
+            f.write("\n".join(summary) + "\n")
+
+    def describe(self) -> str:
+        """Summary line for status output"""
+        if not self.is_active:
+            return "Off"
+        elapsed = (datetime.now() - self.started_at).total_seconds()
+        return f"{self.mode} for {elapsed:.0f}s"
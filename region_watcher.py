@@ -0,0 +1,131 @@
+import threading
+import time
+from typing import Callable, Optional, Tuple
+import numpy as np
+from deadline import Deadline
+from image_stats import ImageStats, changed_fraction
+from ocr_service import is_error_result
+
+
+class RegionWatcher:
+    """Recapture a fixed screen region and OCR it only when its content changes"""
+
+    def __init__(self, region: Tuple[int, int, int, int], ocr_service,
+                 on_text: Callable[[str], None], interval: float = 1.0,
+                 change_threshold: float = 0.0001, grab: Optional[Callable] = None):
+        # region is (left, top, right, bottom) in screen coordinates
+        self.region = region
+        self.ocr_service = ocr_service
+        self.on_text = on_text
+        self.interval = interval
+        self.change_threshold = change_threshold
+        self.grab = grab or self._grab_region
+        # Seconds per OCR run; None sizes it per frame (OCRService.job_budget)
+        self.ocr_budget = None
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._ocr_in_flight = threading.Event()
+        self._ocr_frame: Optional[np.ndarray] = None
+        self._last_frame: Optional[np.ndarray] = None
+        self._last_text = None
+
+        # Statistics
+        self.ticks = 0
+        self.ocr_runs = 0
+        self.ocr_failures = 0
+        self.skipped_unchanged = 0
+        self.capture_cpu = 0.0
+        self._started_at = None
+
+    def _grab_region(self):
+        import pyautogui
+        left, top, right, bottom = self.region
+        return pyautogui.screenshot(region=(left, top, right - left, bottom - top))
+
+    def start(self):
+        """Start watching in a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._watch_loop, name="RegionWatcher", daemon=True)
+        self._thread.start()
+        print(f"[Watch] Watching region {self.region} every {self.interval:.2f}s")
+
+    def stop(self):
+        """Stop watching and print statistics"""
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(self.interval + 1.0)
+        self._thread = None
+        print(f"[Watch] Stopped - {self.describe()}")
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _watch_loop(self):
+        # Event.wait doubles as the tick timer and the stop signal
+        while not self._stop_event.is_set():
+            self.tick()
+            self._stop_event.wait(self.interval)
+
+    def tick(self):
+        """Capture once and start OCR if the region changed"""
+        cpu_start = time.thread_time()
+        try:
+            frame_image = self.grab()
+            frame = ImageStats(frame_image).thumbnail()
+        except Exception as e:
+            print(f"[Watch] Capture failed: {e}")
+            return
+        finally:
+            self.ticks += 1
+
+        previous = self._last_frame
+        self._last_frame = frame
+
+        # Only OCR once the content has settled, so transitions are not transcribed
+        settled = previous is not None and changed_fraction(previous, frame) <= self.change_threshold
+        changed = self._ocr_frame is None or changed_fraction(self._ocr_frame, frame) > self.change_threshold
+        self.capture_cpu += time.thread_time() - cpu_start
+
+        if not changed:
+            self.skipped_unchanged += 1
+            return
+        if not settled or self._ocr_in_flight.is_set():
+            return
+
+        self._ocr_frame = frame
+        self._ocr_in_flight.set()
+        self.ocr_runs += 1
+        budget = self.ocr_budget or self.ocr_service.job_budget([frame_image])
+        self.ocr_service.recognize_async(frame_image, self._on_ocr_result, Deadline(budget, interactive=False))
+
+    def _on_ocr_result(self, text: str):
+        if is_error_result(text):
+            # Not screen content; forget the frame so the next settled tick retries
+            print(f"[Watch] OCR failed: {text}")
+            self.ocr_failures += 1
+            self._ocr_frame = None
+            self._ocr_in_flight.clear()
+            return
+        self._ocr_in_flight.clear()
+        if self._stop_event.is_set():
+            return
+        if text.strip() and text != self._last_text:
+            self._last_text = text
+            self.on_text(text)
+
+    def cpu_percent(self) -> float:
+        """Capture/diff CPU time as a percentage of wall time since start"""
+        if not self._started_at:
+            return 0.0
+        elapsed = time.monotonic() - self._started_at
+        return 100.0 * self.capture_cpu / elapsed if elapsed > 0 else 0.0
+
+    def describe(self) -> str:
+        """Summary line for status output"""
+        return (f"{self.ticks} captures, {self.ocr_runs} OCR runs ({self.ocr_failures} failed), "
+                f"{self.skipped_unchanged} unchanged, CPU {self.cpu_percent():.2f}%")
@@ -0,0 +1,250 @@
+import json
+import os
+import queue
+import statistics
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from PIL import Image
+from app_paths import get_diagnostics_dir
+from headless_view import FakeEvent
+
+TRACE_VERSION = 1
+EVENTS_FILE = "events.jsonl"
+
+
+class SessionRecorder:
+    """Record a session's controller events, crops and OCR timings to a trace folder
+
+    The trace is an events.jsonl file (one record per line, 't' in seconds
+    since recording started) plus one PNG per selection crop, untrimmed, so
+    the screenshots can be rebuilt for replay without storing full screens.
+    record() only queues; JSON lines and PNGs are written on a worker
+    thread, so recording does not slow down drag handling.
+    """
+
+    def __init__(self, settings: Dict, trace_dir: Optional[str] = None):
+        self.started_at = datetime.now()
+        self.trace_dir = trace_dir or os.path.join(
+            get_diagnostics_dir(), f"trace_{self.started_at.strftime('%Y%m%d_%H%M%S')}"
+        )
+        os.makedirs(self.trace_dir, exist_ok=True)
+        self.event_count = 0
+        self.crop_count = 0
+        self._t0 = time.monotonic()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._write_loop, name="TraceWriter", daemon=True)
+        self._thread.start()
+        self.record("session", version=TRACE_VERSION,
+                    started=self.started_at.isoformat(timespec='seconds'), settings=settings)
+        print(f"[Trace] Recording session to {self.trace_dir}")
+
+    def record(self, event: str, **fields):
+        """Queue one event record (any thread)"""
+        self.event_count += 1
+        self._queue.put(({"t": round(time.monotonic() - self._t0, 4), "event": event, **fields}, None))
+
+    def record_crop(self, area, image):
+        """Queue a selection crop; saved as PNG next to the events"""
+        self.crop_count += 1
+        name = f"crop_{self.crop_count:04d}.png"
+        self.record("crop", area=list(area), file=name)
+        self._queue.put((None, (name, image)))
+
+    def record_clipboard(self, image):
+        """Queue a clipboard image submitted for OCR; saved as PNG next to the events"""
+        self.crop_count += 1
+        name = f"clipboard_{self.crop_count:04d}.png"
+        self.record("clipboard", file=name)
+        self._queue.put((None, (name, image)))
+
+    def stop(self) -> str:
+        """Flush everything queued and close the trace; returns the trace folder"""
+        self._queue.put(None)
+        self._thread.join(10.0)
+        print(f"[Trace] Recording stopped: {self.describe()}")
+        return self.trace_dir
+
+    def _write_loop(self):
+        with open(os.path.join(self.trace_dir, EVENTS_FILE), 'w', encoding='utf-8') as f:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+                record, crop = item
+                if record is not None:
+                    f.write(json.dumps(record, separators=(',', ':')) + "\n")
+                    continue
+                name, image = crop
+                try:
+                    image.save(os.path.join(self.trace_dir, name), compress_level=1)
+                except Exception as e:
+                    print(f"[Trace] Could not save {name}: {e}")
+
+    def describe(self) -> str:
+        """Summary line for status output"""
+        elapsed = time.monotonic() - self._t0
+        return f"{self.event_count} events, {self.crop_count} crops in {elapsed:.0f}s"
+
+
+def load_trace(trace_dir: str) -> List[Dict]:
+    """Read the event records of a trace folder"""
+    with open(os.path.join(trace_dir, EVENTS_FILE), encoding='utf-8') as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    if not records or records[0].get("event") != "session":
+        raise ValueError(f"{trace_dir} is not a session trace")
+    if records[0].get("version") != TRACE_VERSION:
+        raise ValueError(f"Unsupported trace version {records[0].get('version')}")
+    return records
+
+
+def rebuild_screen(trace_dir: str, records: List[Dict], capture_index: int) -> Image.Image:
+    """Screenshot of one capture record, with the crops recorded for it pasted in
+
+    Only the selected areas are known; the rest of the screen is left white,
+    which matches what the capture pipeline sees after cropping.
+    """
+    screen = Image.new('RGB', tuple(records[capture_index]["screen"]), 'white')
+    for record in records[capture_index + 1:]:
+        if record["event"] == "capture":
+            break
+        if record["event"] == "crop":
+            with Image.open(os.path.join(trace_dir, record["file"])) as crop:
+                screen.paste(crop.convert('RGB'), tuple(record["area"][:2]))
+    return screen
+
+
+def replay_trace(trace_dir: str, controller, speed: float = 1.0, settings: Optional[Dict] = None,
+                 timeout: float = 60.0) -> Dict:
+    """Drive a headless MainController through a recorded session
+
+    speed scales the recorded timing (1 = original, 10 = ten times faster,
+    0 = no waiting). settings override the recorded controller settings,
+    e.g. {"speculative_ocr": True} to replay a session with speculation.
+    Returns the recorded and replayed job latencies.
+    """
+    records = load_trace(trace_dir)
+    applied = dict(records[0].get("settings", {}))
+    applied.update(settings or {})
+    for name in ("speculative_ocr", "trim_margins", "trim_pad", "ocr_budget"):
+        if name in applied:
+            setattr(controller, name, applied[name])
+    if "multi_region_policy" in applied:
+        controller.ocrService.multi_region_policy = applied["multi_region_policy"]
+
+    view = controller.mainView
+    view.create_main_window()
+    controller.hotkey_release_delay = 0
+    job_ids = {}  # recorded job ID -> replayed job ID
+    replayed_jobs = []
+    # Refinements and closes that followed a result wait for the replayed result too
+    finished_ids = {record["job_id"] for record in records if record["event"] == "job_result"}
+    deferred = []  # (replayed job ID, action) in recorded order
+    recorded = {"latency": [], "perceived": []}
+    skipping = False  # inside a watch-mode capture (needs the live screen)
+    started = time.monotonic()
+
+    for index, record in enumerate(records):
+        event = record["event"]
+        if speed > 0:
+            due = started + record["t"] / speed
+            while time.monotonic() < due:
+                view.root.run_pending(timeout=due - time.monotonic())
+        view.root.run_pending()
+        deferred = _run_deferred(controller, deferred)
+
+        if event == "capture":
+            skipping = record.get("watch", False)
+            if skipping:
+                print("[Trace] Skipping watch-mode capture")
+                continue
+            screen = rebuild_screen(trace_dir, records, index)
+            controller.grab_screen = lambda: screen
+            controller.start_screenshot()
+            view.root.run_pending()
+        elif event == "clipboard":
+            with Image.open(os.path.join(trace_dir, record["file"])) as image:
+                clipboard = image.copy()
+            controller.grab_clipboard = lambda: clipboard
+            controller.start_clipboard_ocr()
+            view.root.run_pending()
+        elif event == "job_result" and not record.get("refinement"):
+            recorded["latency"].append(record["latency"])
+            if record.get("perceived") is not None:
+                recorded["perceived"].append(record["perceived"])
+        elif skipping:
+            continue
+        elif event == "mouse_down":
+            controller.on_mouse_down(FakeEvent(record["x"], record["y"], record.get("state", 0)))
+        elif event == "mouse_drag":
+            controller.on_mouse_drag(FakeEvent(record["x"], record["y"]))
+        elif event == "mouse_up":
+            controller.on_mouse_up(FakeEvent(record["x"], record["y"]))
+        elif event == "confirm":
+            controller.on_keyboard_confirm(None)
+        elif event == "cancel":
+            controller.global_cancel()
+        elif event == "job_started":
+            # Confirmation creates the job synchronously, so it is the view's latest tab
+            job_ids[record["job_id"]] = view.last_job_id
+            job = controller.jobs.get(view.last_job_id)
+            if job:
+                replayed_jobs.append(job)
+        elif event == "refine" and record["job_id"] in job_ids:
+            job_id = job_ids[record["job_id"]]
+            deferred.append((job_id, lambda job_id=job_id, text=record["instruction"]:
+                             controller.on_job_refine(job_id, text)))
+        elif event == "job_closed" and record["job_id"] in job_ids:
+            job_id = job_ids[record["job_id"]]
+            if record["job_id"] in finished_ids:
+                deferred.append((job_id, lambda job_id=job_id: view.close_job_panel(job_id)))
+            else:
+                view.close_job_panel(job_id)
+
+    # Let jobs still running at the end of the trace finish
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        deferred = _run_deferred(controller, deferred)
+        if not deferred and not any(job.is_pending for job in replayed_jobs):
+            break
+        view.root.run_pending(timeout=0.5)
+    elapsed = time.monotonic() - started
+    for job_id in list(view.open_jobs):
+        view.close_job_panel(job_id)
+
+    # Refined jobs only keep the timing of their last refinement
+    done = [job for job in replayed_jobs if job.status == job.DONE and not job.refinements]
+    return {
+        "events": len(records),
+        "captures": sum(1 for record in records if record["event"] == "capture"),
+        "duration": records[-1]["t"],
+        "elapsed": elapsed,
+        "settings": applied,
+        "recorded_latency": recorded["latency"],
+        "recorded_perceived": recorded["perceived"],
+        "latency": [job.latency() for job in done],
+        "perceived": [job.perceived_latency() for job in done],
+        "refinements": sum(job.refinements for job in replayed_jobs),
+        "unfinished": sum(1 for job in replayed_jobs if job.is_pending),
+    }
+
+
+def _run_deferred(controller, deferred: List) -> List:
+    """Run deferred job actions once their job has finished, keeping each job's actions in order"""
+    waiting = []
+    blocked = set()
+    for job_id, action in deferred:
+        job = controller.jobs.get(job_id)
+        if job_id in blocked or (job and job.is_pending):
+            blocked.add(job_id)
+            waiting.append((job_id, action))
+        else:
+            action()
+    return waiting
+
+
+def recorded_backend_latency(trace_dir: str) -> Optional[float]:
+    """Median recorded OCR latency, a mock backend latency that resembles the session"""
+    latencies = [record["latency"] for record in load_trace(trace_dir) if record["event"] == "job_result"]
+    return statistics.median(latencies) if latencies else None
@@ -0,0 +1,126 @@
+"""Headless soak test for the capture -> OCR -> close lifecycle
+
+Drives MainController without windows against the mock Ollama backend for
+thousands of cycles, sampling RSS and tracemalloc along the way. Exits with
+a non-zero status if memory keeps growing after the warm-up.
+
+Usage:
+    python soak_test.py [--cycles N] [--screen WIDTHxHEIGHT]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+import psutil
+from PIL import Image, ImageDraw
+from headless_view import FakeEvent
+from main_controller import MainController
+from mock_ollama import MockOllamaServer
+
+
+def make_screen(size, cycle):
+    """Synthetic full-screen capture that differs from cycle to cycle"""
+    screen = Image.new('RGB', size, (cycle * 7 % 256, 255, 255))
+    ImageDraw.Draw(screen).text((120, 140), f"Soak cycle {cycle}: $ E = mc^2 $", fill='black')
+    return screen
+
+
+def run_cycle(controller, cycle, screen_size, timeout=10.0):
+    """One full capture/OCR/close cycle; returns False if OCR did not finish"""
+    view = controller.mainView
+    controller.grab_screen = lambda: make_screen(screen_size, cycle)
+
+    controller.start_screenshot()
+    view.root.run_pending()
+
+    controller.on_mouse_down(FakeEvent(100, 100))
+    for step in range(1, 6):
+        controller.on_mouse_drag(FakeEvent(100 + step * 80, 100 + step * 20))
+    controller.on_mouse_up(FakeEvent(500, 200))
+    controller.on_keyboard_confirm(None)
+
+    # Pump the headless main loop until the OCR result arrives
+    job_id = view.last_job_id
+    deadline = time.monotonic() + timeout
+    while job_id not in view.job_results and time.monotonic() < deadline:
+        view.root.run_pending(timeout=0.5)
+    finished = job_id in view.job_results
+
+    view.close_job_panel(job_id)
+    return finished
+
+
+def run_soak(cycles, screen_size, warmup, max_rss_growth_mb, max_traced_growth_mb):
+    """Run the soak test; returns True if memory stayed flat"""
+    server = MockOllamaServer(latency=0.0)
+    controller = MainController(headless=True)
+    controller.ocrService.ollama_url = server.start()
+    controller.hotkey_release_delay = 0
+    controller.mainView.create_main_window()
+
+    process = psutil.Process()
+    tracemalloc.start(10)
+    baseline_rss = baseline_snapshot = None
+    failures = 0
+    peak_images = 0
+    started = time.perf_counter()
+
+    for cycle in range(cycles):
+        if not run_cycle(controller, cycle, screen_size):
+            failures += 1
+        peak_images = max(peak_images, controller.image_budget.peak_count)
+
+        if cycle + 1 == warmup:
+            baseline_rss = process.memory_info().rss
+            baseline_snapshot = tracemalloc.take_snapshot()
+        if (cycle + 1) % max(1, cycles // 10) == 0:
+            current, peak = tracemalloc.get_traced_memory()
+            print(f"[Soak] cycle {cycle + 1}/{cycles}: RSS {process.memory_info().rss / 1e6:.1f} MB, "
+                  f"traced {current / 1e6:.2f} MB (peak {peak / 1e6:.1f} MB), "
+                  f"images held {controller.image_budget.count}")
+
+    elapsed = time.perf_counter() - started
+    final_rss = process.memory_info().rss
+    final_snapshot = tracemalloc.take_snapshot()
+    controller.cleanup()
+    server.stop()
+
+    print(f"[Soak] {cycles} cycles in {elapsed:.1f}s ({cycles / elapsed:.1f} cycles/s), "
+          f"{failures} OCR timeouts, peak images held {peak_images}")
+
+    if baseline_snapshot is None:
+        print("[Soak] Not enough cycles to pass the warm-up, no memory verdict")
+        return failures == 0
+
+    rss_growth = (final_rss - baseline_rss) / 1e6
+    top_stats = final_snapshot.compare_to(baseline_snapshot, 'lineno')
+    traced_growth = sum(stat.size_diff for stat in top_stats) / 1e6
+    print(f"[Soak] Growth after warm-up: RSS {rss_growth:+.1f} MB, traced {traced_growth:+.2f} MB")
+    print("[Soak] Top allocation growth:")
+    for stat in top_stats[:5]:
+        print(f"[Soak]   {stat}")
+
+    ok = (failures == 0 and rss_growth <= max_rss_growth_mb
+          and traced_growth <= max_traced_growth_mb
+          and peak_images <= controller.max_live_images)
+    print(f"[Soak] {'PASS' if ok else 'FAIL'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless memory soak test")
+    parser.add_argument("--cycles", type=int, default=2000)
+    parser.add_argument("--screen", default="1920x1080")
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--max-rss-growth", type=float, default=30.0, help="MB")
+    parser.add_argument("--max-traced-growth", type=float, default=2.0, help="MB")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.screen.lower().split("x"))
+    ok = run_soak(args.cycles, (width, height), args.warmup,
+                  args.max_rss_growth, args.max_traced_growth)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
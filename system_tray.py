@@ -3,14 +3,20 @@ from tkinter import messagebox
 import pystray
 from PIL import Image, ImageDraw
 import threading
+import subprocess
 import sys
 import os
+from app_paths import get_diagnostics_dir
+
+# Seconds Exit waits for the controller to save and close everything before forcing exit
+SHUTDOWN_TIMEOUT = 15.0
 
 class SystemTrayManager:
     def __init__(self, main_controller):
         self.main_controller = main_controller
         self.tray_icon = None
         self.is_running = True
+        self.track_allocations = False
     
     
     def create_tray_icon(self):
@@ -21,8 +27,25 @@ class SystemTrayManager:
         # Create menu
         menu = pystray.Menu(
             pystray.MenuItem("OCR Screenshot (F1)", self.start_screenshot),
+            pystray.MenuItem("OCR Clipboard Image (F2)", self.start_clipboard_ocr),
+            pystray.MenuItem("Watch Region", self.toggle_watch_mode, checked=self._is_watching),
+            pystray.MenuItem("Speculative OCR", self.toggle_speculative_ocr,
+                             checked=lambda item: self.main_controller.speculative_ocr),
             pystray.MenuItem("Show Status", self.show_status),
             pystray.Menu.SEPARATOR,
+            pystray.MenuItem("Profiling", pystray.Menu(
+                pystray.MenuItem("Start Sampling Profiler", self.start_sampling_profiler,
+                                 enabled=self._profiler_idle),
+                pystray.MenuItem("Start cProfile", self.start_cprofile, enabled=self._profiler_idle),
+                pystray.MenuItem("Track Allocations", self.toggle_allocation_tracking,
+                                 checked=lambda item: self.track_allocations),
+                pystray.MenuItem("Stop and Save Report", self.stop_profiler,
+                                 enabled=lambda item: not self._profiler_idle(item)),
+                pystray.Menu.SEPARATOR,
+                pystray.MenuItem("Record Session Trace", self.toggle_trace_recording,
+                                 checked=lambda item: self.main_controller.trace_recorder is not None),
+                pystray.MenuItem("Open Diagnostics Folder", self.open_diagnostics_folder)
+            )),
             pystray.MenuItem("Settings", self.show_settings),
             pystray.MenuItem("History", self.show_history),
             pystray.Menu.SEPARATOR,
@@ -77,6 +100,34 @@ class SystemTrayManager:
         if self.main_controller:
             self.main_controller.start_screenshot()
     
+    def start_clipboard_ocr(self, icon=None, item=None):
+        """OCR the clipboard image from tray menu"""
+        print("[Tray] Starting clipboard OCR from tray menu")
+        if self.main_controller:
+            self.main_controller.start_clipboard_ocr()
+    
+    def toggle_watch_mode(self, icon=None, item=None):
+        """Start or stop region watch mode from tray menu"""
+        if not self.main_controller:
+            return
+        if self._is_watching(item):
+            print("[Tray] Stopping region watch from tray menu")
+            self.main_controller.dispatcher.post(self.main_controller.stop_watch_mode)
+        else:
+            print("[Tray] Starting region watch from tray menu")
+            self.main_controller.start_watch_mode()
+    
+    def toggle_speculative_ocr(self, icon=None, item=None):
+        """Start OCR on mouse release instead of waiting for Enter"""
+        controller = self.main_controller
+        controller.speculative_ocr = not controller.speculative_ocr
+        print(f"[Tray] Speculative OCR {'on' if controller.speculative_ocr else 'off'}")
+    
+    def _is_watching(self, item=None):
+        """Menu check state for watch mode"""
+        watcher = self.main_controller.region_watcher if self.main_controller else None
+        return bool(watcher and watcher.is_running)
+    
     def show_status(self, icon=None, item=None):
         """Show status information"""
         if self.main_controller:
@@ -85,8 +136,76 @@ class SystemTrayManager:
         # Also show in tray notification
         if self.tray_icon:
             status = "Ready for screenshot" if not self.main_controller.is_capturing else "Capturing..."
+            status += f"\nOCR backend: {self.main_controller.ocrService.circuit_breaker.describe()}"
             self.tray_icon.notify("OCR Agent Status", status)
     
+    def update_backend_status(self, state):
+        """Reflect OCR circuit breaker state in the tray tooltip"""
+        if not self.tray_icon:
+            return
+        if state == "closed":
+            self.tray_icon.title = "OCR Screenshot Tool"
+        else:
+            self.tray_icon.title = f"OCR Screenshot Tool - OCR backend {state}"
+    
+    def show_throughput_alert(self, message):
+        """Notify that OCR throughput dropped below its baseline"""
+        if self.tray_icon:
+            self.tray_icon.notify("OCR throughput regression", message)
+    
+    def _profiler_idle(self, item=None):
+        """Menu enabled state: no profiling session running"""
+        return not (self.main_controller and self.main_controller.profiler.is_active)
+    
+    def start_sampling_profiler(self, icon=None, item=None):
+        """Start a sampling profiler session across all threads"""
+        print("[Tray] Starting sampling profiler")
+        self.main_controller.profiler.start("sampling", self.track_allocations)
+        if self.tray_icon:
+            self.tray_icon.notify("Profiling", "Sampling profiler started")
+    
+    def start_cprofile(self, icon=None, item=None):
+        """Start a cProfile session"""
+        print("[Tray] Starting cProfile")
+        self.main_controller.profiler.start("cprofile", self.track_allocations)
+        if self.tray_icon:
+            self.tray_icon.notify("Profiling", "cProfile started")
+    
+    def toggle_allocation_tracking(self, icon=None, item=None):
+        """Include tracemalloc allocation sites in the next session"""
+        self.track_allocations = not self.track_allocations
+        print(f"[Tray] Allocation tracking {'on' if self.track_allocations else 'off'}")
+    
+    def stop_profiler(self, icon=None, item=None):
+        """Stop profiling and write the report"""
+        report_dir = self.main_controller.profiler.stop()
+        if report_dir and self.tray_icon:
+            self.tray_icon.notify("Profiling report saved", report_dir)
+    
+    def toggle_trace_recording(self, icon=None, item=None):
+        """Start or stop recording a session trace for headless replay"""
+        controller = self.main_controller
+        if controller.trace_recorder is None:
+            print("[Tray] Starting session trace")
+            controller.start_trace_recording()
+            return
+        trace_dir = controller.stop_trace_recording()
+        if trace_dir and self.tray_icon:
+            self.tray_icon.notify("Session trace saved", trace_dir)
+    
+    def open_diagnostics_folder(self, icon=None, item=None):
+        """Open the diagnostics folder in the file manager"""
+        path = get_diagnostics_dir()
+        try:
+            if sys.platform == 'win32':
+                os.startfile(path)
+            elif sys.platform == 'darwin':
+                subprocess.Popen(['open', path])
+            else:
+                subprocess.Popen(['xdg-open', path])
+        except Exception as e:
+            print(f"[Tray] Could not open diagnostics folder: {e}")
+    
     def show_settings(self, icon=None, item=None):
         """Show settings window"""
         print("[Tray] Opening settings (not implemented yet)")
@@ -138,21 +257,23 @@ Developer: Your Name
                 "Are you sure you want to exit OCR Agent?\n\nThe application will stop running in the background."
             )
             
-            if result:
-                print("[Tray] User confirmed exit")
-                if self.tray_icon:
-                    self.tray_icon.stop()
-                
-                # Cleanup main controller
-                if self.main_controller:
-                    self.main_controller.quit_threaded()
-                
-                # Force exit
-                os._exit(0)
-            else:
+            root.destroy()
+            if not result:
                 print("[Tray] User cancelled exit")
+                return
             
-            root.destroy()
+            print("[Tray] User confirmed exit")
+            if self.tray_icon:
+                self.tray_icon.stop()
+            
+            if self.main_controller:
+                # The Tk loop exits and run() cleans up (saves the profile and trace, closes
+                # the journal, stores the latency model); the process then ends normally
+                self.main_controller.quit_threaded()
+                if self.main_controller.shutdown_complete.wait(SHUTDOWN_TIMEOUT):
+                    return
+                print("[Tray] Cleanup did not finish, forcing exit")
+            os._exit(0)
         
         threading.Thread(target=confirm_quit, daemon=True).start()
     
@@ -0,0 +1,66 @@
+import queue
+import threading
+from typing import Callable
+
+
+class TkDispatcher:
+    """Thread-safe command queue drained on the Tk main loop
+
+    Worker threads, hotkeys and the tray post callables; the Tk thread runs
+    them in order. Only the first post after a drain schedules a wake-up, so
+    a burst of results costs a single Tk callback, and an idle application
+    is never woken.
+    """
+
+    def __init__(self, view):
+        self.view = view
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._drain_scheduled = False
+        # Number of times the Tk loop was woken to drain the queue
+        self.wakeups = 0
+
+    def post(self, func: Callable, *args):
+        """Queue func(*args) for execution on the Tk thread"""
+        self._queue.put((func, args))
+        with self._lock:
+            if self._drain_scheduled:
+                return
+            self._drain_scheduled = True
+        self._schedule_drain()
+
+    def wrap(self, func: Callable) -> Callable:
+        """Return a callback that forwards its arguments to func on the Tk thread"""
+        def forward(*args):
+            self.post(func, *args)
+        return forward
+
+    def _schedule_drain(self):
+        root = self.view.root
+        if root is None:
+            print("[Bridge] Warning: Tk root not available, results stay queued")
+            with self._lock:
+                self._drain_scheduled = False
+            return
+        try:
+            root.after(0, self.drain)
+        except RuntimeError as e:
+            # Main loop not running yet or already gone; the next post tries again
+            print(f"[Bridge] Could not schedule drain: {e}")
+            with self._lock:
+                self._drain_scheduled = False
+
+    def drain(self):
+        """Run every queued callable (Tk thread only)"""
+        with self._lock:
+            self._drain_scheduled = False
+        self.wakeups += 1
+        while True:
+            try:
+                func, args = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"[Bridge] Error in queued callback: {e}")